@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the indexer and the Linear sync pipelines.
+
+Builds a synthetic workspace in a temporary folder (dated report folders,
+email_notes/ and meeting_notes/), starts mock_linear.py in-process with the
+given latency/rate limit, and runs each stage against it:
+
+- index: full build, then an incremental run with nothing changed
+- email: first sync (creates), unchanged re-run, re-run after editing 10% of notes
+- meeting: first sync, then the status refresh
+- todo: full TODO.md sync, then a delta sync
+
+For every stage it reports wall time, Linear requests (and rate-limited
+responses), bytes sent and peak RSS. --save writes the results as JSON;
+--baseline compares against such a file and exits 1 when a stage got slower
+than the tolerance allows, so regressions are caught before deploy.
+
+    python benchmark.py --reports 200 --notes 300 --latency 30
+    python benchmark.py --save bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+import mock_linear
+
+KO_WORDS = ("기부", "후원자", "페이스메이커", "비영리", "전략", "분석", "모델", "캠페인", "성장",
+            "데이터", "보고서", "회의", "목표", "참여", "지역사회", "교육", "프로그램", "운영")
+EN_WORDS = ("donor", "retention", "campaign", "strategy", "nonprofit", "growth", "impact",
+            "education", "report", "analysis", "partner", "funding", "model", "community")
+# Inline CSS of a typical report, so files are realistic in size (~60 KB)
+STYLE = ".section{margin:2rem 0;padding:1rem}.tag{display:inline-block}\n" * 300
+
+
+def words(rng, count):
+    """Mixed Korean/English filler text."""
+    return " ".join(rng.choice(KO_WORDS if rng.random() < 0.6 else EN_WORDS) for _ in range(count))
+
+
+def make_report(rng, day):
+    sections = []
+    for n in range(1, 7):
+        paragraphs = "".join(f"<p>{words(rng, 60)}</p>" for _ in range(8))
+        sections.append(f'<section class="section"><span class="section-number">Section {n:02d}</span>'
+                        f'<h2 class="section-title">{words(rng, 4)}</h2>{paragraphs}</section>')
+    tags = "".join(f'<span class="tag">{rng.choice(KO_WORDS)}</span>' for _ in range(3))
+    return (f"<!DOCTYPE html><html lang=\"ko\"><head><meta charset=\"UTF-8\">"
+            f"<title>{words(rng, 5)} | Pacemaker</title><style>{STYLE}</style></head><body>"
+            f"<header><p class=\"report-date\">{day.strftime('%B %d, %Y')}</p>{tags}</header>"
+            f"<main><div class=\"container\">{''.join(sections)}</div></main></body></html>")
+
+
+def generate_reports(base_dir, count, rng):
+    """`count` dated report folders (MMDDYYYY/index.html) plus a root index.html."""
+    os.makedirs(base_dir, exist_ok=True)
+    with open(os.path.join(base_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write("<html><body>landing page</body></html>")
+    day = date(2025, 1, 1)
+    for _ in range(count):
+        folder = os.path.join(base_dir, day.strftime("%m%d%Y"))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as f:
+            f.write(make_report(rng, day))
+        day += timedelta(days=1)
+
+
+def generate_notes(count, issue_ids, rng):
+    """Email and meeting notes in the current folder; meeting tables link to `issue_ids`."""
+    os.makedirs("email_notes", exist_ok=True)
+    os.makedirs("meeting_notes", exist_ok=True)
+    for n in range(count):
+        with open(os.path.join("email_notes", f"email_{n:04d}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Email: {words(rng, 5)}\n\n- **From**: a@example.org\n- **To**: b@example.org\n"
+                    f"- **Date**: 2026-01-{n % 28 + 1:02d}\n\n## 내용\n\n{words(rng, 400)}\n")
+    for n in range(max(1, count // 5)):
+        rows = []
+        for _ in range(8):
+            ident = rng.choice(issue_ids)
+            rows.append(f"| Ops | High | {words(rng, 3)} | {words(rng, 8)} | "
+                        f"[{ident}](https://linear.app/mock/issue/{ident}/) |")
+        with open(os.path.join("meeting_notes", f"meeting_{n:04d}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Meeting: {words(rng, 4)}\n\n- **Date**: 2026-01-{n % 28 + 1:02d}\n\n"
+                    "| Project | Priority | Item | Description | Link |\n| --- | --- | --- | --- | --- |\n"
+                    + "\n".join(rows) + "\n")
+
+
+def edit_notes(fraction, rng):
+    paths = sorted(os.listdir("email_notes"))
+    for name in rng.sample(paths, max(1, int(len(paths) * fraction))):
+        with open(os.path.join("email_notes", name), "a", encoding="utf-8") as f:
+            f.write(f"\n{words(rng, 20)}\n")
+
+
+def peak_rss_mb():
+    """Peak RSS of this process and of finished child processes (index workers), in MB."""
+    scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own / 2**20, children / 2**20
+
+
+def run_stage(name, func, server, verbose):
+    from linear_client import stats
+    before_requests = stats["requests"]
+    before = dict(server.linear.stats)
+    start = time.perf_counter()
+    if verbose:
+        func()
+    else:
+        with redirect_stdout(io.StringIO()):
+            func()
+    wall = time.perf_counter() - start
+    own_rss, child_rss = peak_rss_mb()
+    after = server.linear.stats
+    return {
+        "stage": name,
+        "wall": wall,
+        "requests": stats["requests"] - before_requests,
+        "rate_limited": after["rate_limited"] - before["rate_limited"],
+        "bytes_sent": after["bytes_in"] - before["bytes_in"],
+        "peak_rss_mb": own_rss,
+        "peak_child_rss_mb": child_rss,
+    }
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    server = mock_linear.start(latency=args.latency / 1000, rate_limit=args.rate_limit,
+                               rate_window=args.rate_window)
+    # linear_client reads these at import time
+    os.environ.update({"LINEAR_API_URL": server.url, "LINEAR_API_KEY": "benchmark",
+                       "LINEAR_BACKOFF": "0.05"})
+    os.environ.pop("LINEAR_TEAM_ID", None)
+
+    workdir = tempfile.mkdtemp(prefix="linear-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        issue_ids = [server.linear.add_issue(f"Seed {n}", state_type=rng.choice(
+            ("unstarted", "started", "completed", "canceled")))["identifier"] for n in range(args.issues)]
+        generate_reports("reports", args.reports, rng)
+        generate_notes(args.notes, issue_ids, rng)
+        with open("TODO.md", "w", encoding="utf-8") as f:
+            f.write("# TODO List\n")
+
+        import update_index
+        from sync_email_linear import sync_email_notes
+        from sync_meeting_linear import sync_meeting_notes
+        from sync_linear import sync_todo
+        from update_status import refresh_statuses
+
+        stages = [
+            ("index full", lambda: update_index.index_reports("reports", jobs=args.jobs, parser=args.parser)),
+            ("index incremental", lambda: update_index.index_reports(
+                "reports", incremental=True, jobs=args.jobs, parser=args.parser)),
+            ("email create", lambda: sync_email_notes(jobs=args.jobs)),
+            ("email unchanged", lambda: sync_email_notes(jobs=args.jobs)),
+            ("email update 10%", lambda: (edit_notes(0.1, rng), sync_email_notes(jobs=args.jobs))),
+            ("meeting create", lambda: sync_meeting_notes(jobs=args.jobs)),
+            ("status refresh", lambda: refresh_statuses(jobs=args.jobs)),
+            ("todo full", lambda: sync_todo()),
+            ("todo delta", lambda: sync_todo(delta=True)),
+        ]
+        return [run_stage(name, func, server, args.verbose) for name, func in stages]
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        if args.keep:
+            print(f"Workspace kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_results(results):
+    print(f"{'stage':<20} {'wall s':>8} {'requests':>9} {'limited':>8} {'sent KB':>9} {'RSS MB':>8} {'child MB':>9}")
+    for r in results:
+        print(f"{r['stage']:<20} {r['wall']:>8.3f} {r['requests']:>9} {r['rate_limited']:>8} "
+              f"{r['bytes_sent'] / 1024:>9.1f} {r['peak_rss_mb']:>8.1f} {r['peak_child_rss_mb']:>9.1f}")
+    print(f"{'total':<20} {sum(r['wall'] for r in results):>8.3f} {sum(r['requests'] for r in results):>9}")
+
+
+def compare(results, baseline_file, tolerance, min_delta=0.05):
+    """Stages slower than baseline by more than `tolerance` (and min_delta seconds)."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {r["stage"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get(r["stage"])
+        if not old:
+            continue
+        if r["wall"] > old["wall"] * (1 + tolerance) and r["wall"] - old["wall"] > min_delta:
+            regressions.append(f"{r['stage']}: {old['wall']:.3f}s -> {r['wall']:.3f}s")
+        if r["requests"] > old["requests"]:
+            regressions.append(f"{r['stage']}: {old['requests']} -> {r['requests']} requests")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the indexer and sync pipelines against a mock Linear API.")
+    parser.add_argument("--reports", type=int, default=100, help="Synthetic report folders")
+    parser.add_argument("--notes", type=int, default=200, help="Synthetic email notes (meeting notes: a fifth of that)")
+    parser.add_argument("--issues", type=int, default=300, help="Issues seeded in the mock workspace")
+    parser.add_argument("--latency", type=float, default=20, help="Mock API latency per request, in ms")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Mock API requests allowed per window")
+    parser.add_argument("--rate-window", type=float, default=1, help="Mock API rate-limit window, in seconds")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="Index worker processes / concurrent requests")
+    parser.add_argument("--parser", choices=("html.parser", "lxml", "stream"), default="stream")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs. the baseline (0.2 = 20%%)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspace")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show the scripts' own output")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions vs. baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            exit(1)
+        print("\nNo regressions vs. baseline.")
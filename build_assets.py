@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Build an optimized copy of the site into dist/ for deployment.
+
+- HTML pages (the landing page, every report folder and other top-level
+  .html files) are minified: comments dropped, whitespace runs collapsed
+  outside <pre>/<textarea> and elements styled with white-space: pre*,
+  inline CSS and JS minified
+- CSS rules found on every page move into one content-hashed stylesheet
+  (assets/shared.<hash>.css) that each page links before its own <style>;
+  a rule only moves when doing so cannot reorder it against a rule setting
+  the same property
+- Images get content-hashed names under assets/ (recompressed when Pillow
+  is installed) and page references are rewritten to them
+- The search index files the landing page fetches are copied over
+- Every text output gets .gz (and .br when brotli is installed) next to it
+
+Builds are incremental: dist/.build-manifest.json keeps a hash of each
+output's inputs, and outputs whose inputs are unchanged are not rebuilt.
+Outputs that no longer have a source are removed.
+
+    python build_assets.py
+    python build_assets.py --base-dir . --out dist --force
+"""
+
+import io
+import os
+import re
+import json
+import gzip
+import hashlib
+import argparse
+import posixpath
+from html.parser import HTMLParser
+from update_index import (find_reports, walk_site, load_json, VOID_ELEMENTS, LANDING_PAGE,
+                          INDEX_FILE, INVERTED_INDEX_FILE, SHARD_DIR, DIST_DIR)
+import profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = "assets"
+BUILD_MANIFEST = ".build-manifest.json"
+# Bump when the minifiers change so every output is rebuilt
+BUILD_VERSION = 1
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg")
+COMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg")
+# Search files the landing page fetches at runtime, copied as they are
+STATIC_FILES = (INVERTED_INDEX_FILE, INDEX_FILE)
+HASH_LENGTH = 10
+
+STYLE_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+# Quoted strings and comments, which CSS minification must leave alone / drop
+CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+PRESERVE_WHITESPACE_RE = re.compile(r"white-space:\s*(?:pre|pre-wrap|pre-line|break-spaces)\b")
+URL_ATTR_RE = re.compile(r'(\b(?:href|src|content)=")([^"]+)(")', re.I)
+HTML_SPACE_RE = re.compile(r"[ \t\r\n\f]+")
+# Keywords after which a "/" starts a regular expression rather than a division
+JS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw"}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(path, data):
+    """og-image.png -> og-image.<hash>.png"""
+    root, ext = os.path.splitext(os.path.basename(path))
+    return f"{root}.{content_hash(data)}{ext}"
+
+
+def minify_css(css):
+    """Drop comments and whitespace that carries no meaning; strings are kept as written."""
+    out = []
+    pos = 0
+    for match in CSS_TOKEN_RE.finditer(css):
+        out.append(_minify_css_code(css[pos:match.start()]))
+        if not match.group().startswith("/*"):
+            out.append(match.group())
+        pos = match.end()
+    out.append(_minify_css_code(css[pos:]))
+    return "".join(out).strip()
+
+
+def _minify_css_code(code):
+    code = re.sub(r"\s+", " ", code)
+    code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+    code = re.sub(r":\s+", ":", code)
+    return code.replace(";}", "}")
+
+
+def split_rules(css):
+    """Top-level rules of minified CSS (an @media block counts as one rule)."""
+    rules = []
+    depth = 0
+    start = 0
+    pos = 0
+    while pos < len(css):
+        ch = css[pos]
+        if ch in "\"'":
+            pos = _skip_quoted(css, pos, ch) - 1
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:pos + 1])
+                start = pos + 1
+        elif ch == ";" and depth == 0:
+            rules.append(css[start:pos + 1])  # @import / @charset
+            start = pos + 1
+        pos += 1
+    if css[start:].strip():
+        rules.append(css[start:])
+    return rules
+
+
+def rule_properties(rule):
+    return set(re.findall(r"[{;]([-\w]+):", rule))
+
+
+def can_share(rule):
+    return not rule.startswith("@") or rule.startswith(("@media", "@supports"))
+
+
+def shared_rules(pages):
+    """
+    Rules to move into the shared stylesheet, in order. `pages` maps each page
+    to its list of rules. A rule qualifies when every page has it exactly once
+    and, on every page, each rule before it that sets one of the same
+    properties is shared too, and no shared rule after it does.
+    """
+    rule_lists = [rules for rules in pages.values() if rules]
+    if len(rule_lists) < 2:
+        return []
+    common = set(rule_lists[0])
+    for rules in rule_lists[1:]:
+        common &= set(rules)
+
+    shared = []
+    chosen = set()
+    for rule in rule_lists[0]:
+        if rule not in common or rule in chosen or not can_share(rule):
+            continue
+        props = rule_properties(rule)
+        ok = True
+        for rules in rule_lists:
+            if rules.count(rule) != 1:
+                ok = False
+                break
+            pos = rules.index(rule)
+            if any(other not in chosen and props & rule_properties(other) for other in rules[:pos]):
+                ok = False
+                break
+            if any(other in chosen and props & rule_properties(other) for other in rules[pos + 1:]):
+                ok = False
+                break
+        if ok:
+            shared.append(rule)
+            chosen.add(rule)
+    return shared
+
+
+def preserved_classes(css):
+    """Classes styled with white-space: pre* (their text must keep its whitespace)."""
+    classes = set()
+    for match in re.finditer(r"([^{}]+)\{([^{}]*)\}", css):
+        if PRESERVE_WHITESPACE_RE.search(match.group(2)):
+            for selector in match.group(1).split(","):
+                last = selector.strip().split(" ")[-1]
+                classes.update(re.findall(r"\.([-\w]+)", last))
+    return classes
+
+
+def minify_js(code):
+    """
+    Drop comments, indentation and blank lines from a script. Line breaks
+    are kept so automatic semicolon insertion is unaffected; strings,
+    template literals and regular expressions are copied verbatim.
+    """
+    out = []
+    templates = []  # open ${...} nesting depth, one entry per template literal
+    pos = 0
+    n = len(code)
+
+    def last_token():
+        tail = "".join(out[-20:]).rstrip()
+        word = re.search(r"[\w$]+$", tail)
+        return word.group() if word else tail[-1:]
+
+    while pos < n:
+        ch = code[pos]
+        if ch in " \t":
+            end = pos
+            while end < n and code[end] in " \t":
+                end += 1
+            if out and not out[-1].endswith(("\n", " ")):
+                out.append(" ")
+            pos = end
+        elif ch in "\r\n":
+            while pos < n and code[pos] in " \t\r\n":
+                pos += 1
+            if out and not out[-1].endswith("\n"):
+                while out and out[-1] == " ":
+                    out.pop()
+                out.append("\n")
+        elif code.startswith("//", pos):
+            pos = code.find("\n", pos)
+            pos = n if pos == -1 else pos
+        elif code.startswith("/*", pos):
+            end = code.find("*/", pos + 2)
+            end = n if end == -1 else end + 2
+            if out and not out[-1].endswith(("\n", " ")):
+                out.append("\n" if "\n" in code[pos:end] else " ")
+            pos = end
+        elif ch in "\"'":
+            end = _skip_quoted(code, pos, ch)
+            out.append(code[pos:end])
+            pos = end
+        elif ch == "`" or (ch == "}" and templates and templates[-1] == 0):
+            if ch == "}":
+                templates.pop()
+            end = pos + 1
+            while end < n and code[end] != "`":
+                if code[end] == "\\":
+                    end += 2
+                elif code.startswith("${", end):
+                    templates.append(0)
+                    end += 2
+                    break
+                else:
+                    end += 1
+            else:
+                end += 1  # closing backtick
+            out.append(code[pos:end])
+            pos = end
+        elif ch == "/" and _starts_regex(last_token()):
+            end = pos + 1
+            in_class = False
+            while end < n and (code[end] != "/" or in_class):
+                if code[end] == "\\":
+                    end += 1
+                elif code[end] == "[":
+                    in_class = True
+                elif code[end] == "]":
+                    in_class = False
+                end += 1
+            end += 1
+            while end < n and code[end].isalpha():
+                end += 1  # flags
+            out.append(code[pos:end])
+            pos = end
+        else:
+            if templates and ch == "{":
+                templates[-1] += 1
+            elif templates and ch == "}":
+                templates[-1] -= 1
+            out.append(ch)
+            pos += 1
+    return "".join(out).strip()
+
+
+def _starts_regex(token):
+    """Whether a "/" after `token` (the last word or symbol emitted) begins a regex."""
+    return not token or token in JS_REGEX_KEYWORDS or token[-1] in "(,=:[!&|?{};+-*%<>~^"
+
+
+def _skip_quoted(code, pos, quote):
+    """Position just after the string literal starting at pos."""
+    end = pos + 1
+    while end < len(code) and code[end] != quote:
+        end += 2 if code[end] == "\\" else 1
+    return end + 1
+
+
+class PageMinifier(HTMLParser):
+    """
+    Re-emits a page with comments dropped and text whitespace collapsed.
+    Tags are copied as written (except rewritten asset URLs); scripts are
+    minified, styles are expected to be minified already.
+    """
+
+    def __init__(self, preserve_classes=(), rewrite_url=None):
+        super().__init__(convert_charrefs=False)
+        self.preserve_classes = set(preserve_classes)
+        self.rewrite_url = rewrite_url
+        self.out = []
+        self.stack = []
+        self.preserve = 0  # open elements whose whitespace is significant
+        self.raw_tag = None  # "script" / "style" while inside one
+        self.script = []  # script text, minified once the element closes
+
+    def emit_tag(self, text):
+        if self.rewrite_url:
+            text = URL_ATTR_RE.sub(lambda m: m.group(1) + self.rewrite_url(m.group(2)) + m.group(3), text)
+        self.out.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self.emit_tag(self.get_starttag_text())
+        if tag in VOID_ELEMENTS:
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        keep = tag in ("pre", "textarea") or bool(self.preserve_classes.intersection(classes))
+        self.stack.append((tag, keep))
+        if keep:
+            self.preserve += 1
+        if tag in ("script", "style"):
+            self.raw_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self.emit_tag(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self.raw_tag == "script":
+            self.out.append(minify_js("".join(self.script)))
+            self.script = []
+        self.out.append(f"</{tag}>")
+        self.raw_tag = None
+        if tag in VOID_ELEMENTS or tag not in (t for t, _ in self.stack):
+            return
+        # Close any elements left open inside this one
+        while self.stack:
+            open_tag, keep = self.stack.pop()
+            if keep:
+                self.preserve -= 1
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.raw_tag == "script":
+            self.script.append(data)
+        elif self.raw_tag or self.preserve:
+            self.out.append(data)
+        else:
+            self.out.append(HTML_SPACE_RE.sub(lambda m: "\n" if "\n" in m.group() else " ", data))
+
+    def handle_entityref(self, name):
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        if data.startswith("[if"):
+            self.out.append(f"<!--{data}-->")  # conditional comment
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        self.out.append(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        self.out.append(f"<![{data}]>")
+
+
+def page_rules(page_html):
+    """Minified rules of all <style> blocks in a page."""
+    return [rule for css in STYLE_RE.findall(page_html) for rule in split_rules(minify_css(css))]
+
+
+def build_page(page_html, page_dir, shared, shared_file, assets):
+    """
+    Minified page. Shared rules are taken out of its <style> blocks and
+    replaced by a link to `shared_file`; asset URLs are pointed at the
+    hashed copies in `assets` ({source path: output path}, site-relative).
+    """
+    preserve = preserved_classes(minify_css("".join(STYLE_RE.findall(page_html))))
+    shared = set(shared)
+    linked = []
+
+    def replace_style(match):
+        rules = [rule for rule in split_rules(minify_css(match.group(1))) if rule not in shared]
+        link = ""
+        if shared_file and not linked:
+            href = relative_url(page_dir, shared_file)
+            link = f'<link rel="stylesheet" href="{href}">'
+            linked.append(href)
+        return link + (f"<style>{''.join(rules)}</style>" if rules else "")
+
+    page_html = STYLE_RE.sub(replace_style, page_html)
+
+    def rewrite_url(url):
+        if re.match(r"^(?:[a-z][a-z0-9+.-]*:|//|#)", url, re.I):
+            return url  # absolute, protocol-relative or fragment
+        path = url.split("#")[0].split("?")[0]
+        source = posixpath.normpath(path.lstrip("/") if path.startswith("/") else posixpath.join(page_dir, path))
+        if source in assets:
+            return relative_url(page_dir, assets[source])
+        return url
+
+    parser = PageMinifier(preserve, rewrite_url)
+    parser.feed(page_html)
+    parser.close()
+    return "".join(parser.out).strip() + "\n"
+
+
+def relative_url(page_dir, target):
+    rel = posixpath.relpath(target, page_dir or ".")
+    return rel if rel.startswith("../") else "./" + rel
+
+
+def optimize_image(path, data):
+    """Recompressed image bytes (when Pillow is installed and it helps), else the input."""
+    if Image is None or path.lower().endswith((".svg", ".gif")):
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            buffer = io.BytesIO()
+            if path.lower().endswith((".jpg", ".jpeg")):
+                image.save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+            elif path.lower().endswith(".webp"):
+                image.save(buffer, "WEBP", quality=85, method=6)
+            else:
+                image.save(buffer, "PNG", optimize=True)
+    except OSError as e:
+        print(f"Warning: could not recompress {path}: {e}")
+        return data
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+def find_sources(base_dir, out_dir):
+    """(pages, images, static files) as site-relative paths. Nothing in out_dir is a source."""
+    pages = []
+    if os.path.exists(os.path.join(base_dir, LANDING_PAGE)):
+        pages.append(LANDING_PAGE)
+    for name in sorted(os.listdir(base_dir)):
+        if name.endswith(".html") and name != LANDING_PAGE and os.path.isfile(os.path.join(base_dir, name)):
+            pages.append(name)
+    pages.extend(posixpath.join(rel_path.replace(os.sep, "/"), "index.html") for rel_path, _ in find_reports(base_dir, [out_dir]))
+
+    images = []
+    for root, dirs, files in walk_site(base_dir, [out_dir]):
+        dirs[:] = [d for d in dirs if d != "node_modules"]
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.relpath(os.path.join(root, name), base_dir).replace(os.sep, "/"))
+
+    static = [name for name in STATIC_FILES if os.path.exists(os.path.join(base_dir, name))]
+    shard_dir = os.path.join(base_dir, SHARD_DIR)
+    if os.path.isdir(shard_dir):
+        static.extend(f"{SHARD_DIR}/{name}" for name in sorted(os.listdir(shard_dir)) if name.endswith(".json"))
+    return pages, images, static
+
+
+def write_output(out_dir, rel_path, data):
+    """Write an output file plus its pre-compressed copies; returns (size, gzip size)."""
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if not rel_path.endswith(COMPRESSED_EXTENSIONS):
+        return len(data), len(data)
+    # mtime=0 keeps the .gz byte-identical between runs
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + ".gz", "wb") as f:
+        f.write(gz)
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data))
+    return len(data), len(gz)
+
+
+def remove_output(out_dir, rel_path):
+    for ext in ("", ".gz", ".br"):
+        path = os.path.join(out_dir, rel_path + ext)
+        if os.path.exists(path):
+            os.remove(path)
+    folder = os.path.dirname(os.path.join(out_dir, rel_path))
+    while os.path.abspath(folder) != os.path.abspath(out_dir) and not os.listdir(folder):
+        os.rmdir(folder)
+        folder = os.path.dirname(folder)
+
+
+def input_key(*parts):
+    digest = hashlib.sha256(str(BUILD_VERSION).encode())
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build(base_dir=BASE_DIR, out_dir=None, force=False):
+    """Build dist/ from base_dir; returns the number of outputs (re)written."""
+    out_dir = out_dir or os.path.join(base_dir, DIST_DIR)
+    site, out = os.path.abspath(base_dir), os.path.abspath(out_dir)
+    if os.path.commonpath([site, out]) == out:
+        # The build would read its own output (and overwrite the sources)
+        raise ValueError(f"Output folder {out_dir} must not contain the site folder {base_dir}")
+    manifest_file = os.path.join(out_dir, BUILD_MANIFEST)
+    old_manifest = {} if force else load_json(manifest_file, {})
+    manifest = {}
+    stats = {"built": 0, "unchanged": 0, "input": 0, "output": 0, "gzip": 0}
+
+    def emit(rel_path, key, source_size, make):
+        manifest[rel_path] = key
+        if old_manifest.get(rel_path) == key and os.path.exists(os.path.join(out_dir, rel_path)):
+            stats["unchanged"] += 1
+            return
+        size, gz_size = write_output(out_dir, rel_path, make())
+        stats["built"] += 1
+        stats["input"] += source_size
+        stats["output"] += size
+        stats["gzip"] += gz_size
+
+    def read(rel_path):
+        with open(os.path.join(base_dir, rel_path), "rb") as f:
+            return f.read()
+
+    pages, images, static = find_sources(base_dir, out_dir)
+
+    with profiling.span("assets.images", images=len(images)):
+        assets = {}
+        for rel_path in images:
+            data = read(rel_path)
+            target = posixpath.join(ASSET_DIR, hashed_name(rel_path, data))
+            assets[rel_path] = target
+            emit(target, input_key(data, Image is not None), len(data),
+                 lambda data=data, rel_path=rel_path: optimize_image(rel_path, data))
+
+    with profiling.span("assets.styles", pages=len(pages)):
+        sources = {rel_path: read(rel_path) for rel_path in pages}
+        texts = {rel_path: data.decode("utf-8") for rel_path, data in sources.items()}
+        shared = shared_rules({rel_path: page_rules(text) for rel_path, text in texts.items()})
+        shared_file = None
+        if shared:
+            css = "".join(shared).encode("utf-8")
+            shared_file = posixpath.join(ASSET_DIR, hashed_name("shared.css", css))
+            emit(shared_file, input_key(css), 0, lambda: css)
+
+    with profiling.span("assets.pages", pages=len(pages)):
+        for rel_path in pages:
+            page_dir = posixpath.dirname(rel_path)
+            key = input_key(sources[rel_path], shared, shared_file, assets)
+            emit(rel_path, key, len(sources[rel_path]),
+                 lambda rel_path=rel_path, page_dir=page_dir: build_page(
+                     texts[rel_path], page_dir, shared, shared_file, assets).encode("utf-8"))
+
+    with profiling.span("assets.static", files=len(static)):
+        for rel_path in static:
+            data = read(rel_path)
+            emit(rel_path, input_key(data), len(data), lambda data=data: data)
+
+    removed = sorted(set(old_manifest) - set(manifest))
+    for rel_path in removed:
+        remove_output(out_dir, rel_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Built {stats['built']} file(s) into {out_dir}, {stats['unchanged']} unchanged, {len(removed)} removed")
+    if stats["built"]:
+        print(f"Rebuilt inputs {stats['input'] / 1024:.1f} KB -> {stats['output'] / 1024:.1f} KB "
+              f"({stats['gzip'] / 1024:.1f} KB gzipped)")
+    if shared:
+        print(f"{len(shared)} CSS rule(s) shared by all {len(pages)} pages in {shared_file}")
+    if Image is None and images:
+        print("Note: Pillow is not installed, images were copied without recompression")
+    return stats["built"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build minified, cache-busted site files into dist/.")
+    parser.add_argument("--base-dir", default=BASE_DIR, help="Site folder (landing page and report folders)")
+    parser.add_argument("--out", help="Output folder (default: <base-dir>/dist)")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything, ignoring the build manifest")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    try:
+        build(args.base_dir, args.out, args.force)
+    except ValueError as e:
+        parser.error(str(e))
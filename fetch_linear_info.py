@@ -1,54 +1,25 @@
-import os
-import requests
-import json
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_KEY = os.getenv("LINEAR_API_KEY")
-URL = "https://api.linear.app/graphql"
+import argparse
+from linear_client import API_KEY
+from linear_metadata import get_metadata, METADATA_FILE
 
 if not API_KEY:
     print("Error: LINEAR_API_KEY not found in .env")
     exit(1)
 
-headers = {
-    "Authorization": API_KEY,
-    "Content-Type": "application/json"
-}
-
-query = """
-query {
-  teams {
-    nodes {
-      id
-      name
-      key
-    }
-  }
-  workflowStates {
-    nodes {
-        id
-        name
-        type
-        team {
-            id
-        }
-    }
-  }
-}
-"""
+parser = argparse.ArgumentParser(description="Show Linear teams and workflow states.")
+parser.add_argument("--refresh", action="store_true",
+                    help=f"Fetch again instead of using the cache in {METADATA_FILE}")
+args = parser.parse_args()
 
-response = requests.post(URL, headers=headers, json={"query": query})
-
-if response.status_code == 200:
-    data = response.json()
+try:
+    data = get_metadata(refresh=args.refresh)
+except Exception as e:
+    print(f"Error: {e}")
+else:
     print("\n--- Teams ---")
-    for team in data.get("data", {}).get("teams", {}).get("nodes", []):
+    for team in data["teams"]:
         print(f"Name: {team['name']}, Key: {team['key']}, ID: {team['id']}")
     
     print("\n--- Workflow States ---")
-    for state in data.get("data", {}).get("workflowStates", {}).get("nodes", []):
+    for state in data["states"]:
         print(f"Name: {state['name']}, Type: {state['type']}, ID: {state['id']}")
-else:
-    print(f"Error: {response.status_code}, {response.text}")
@@ -0,0 +1,211 @@
+"""
+Shared Linear GraphQL client used by all the sync scripts.
+
+- One keep-alive requests.Session for every call in a run
+- Connect/read timeouts
+- Exponential backoff on rate limits and server errors, honoring Linear's
+  Retry-After / X-RateLimit-* headers
+- Per-request latency and query-complexity counters (see `stats`)
+- Optional record/replay of all traffic for offline runs (see linear_replay)
+
+Settings can be overridden in .env:
+LINEAR_API_URL, LINEAR_TIMEOUT, LINEAR_CONNECT_TIMEOUT, LINEAR_MAX_RETRIES,
+LINEAR_BACKOFF, LINEAR_POOL_SIZE, LINEAR_RECORD_MODE, LINEAR_RECORD_DIR,
+LINEAR_REPLAY_LATENCY
+"""
+
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+import profiling
+import linear_replay
+
+load_dotenv()
+
+API_KEY = os.getenv("LINEAR_API_KEY")
+if linear_replay.MODE == "replay" and not API_KEY:
+    API_KEY = "replay"  # nothing is sent; lets the scripts' key checks pass offline
+URL = os.getenv("LINEAR_API_URL", "https://api.linear.app/graphql")
+CONNECT_TIMEOUT = float(os.getenv("LINEAR_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("LINEAR_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("LINEAR_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("LINEAR_BACKOFF", "1.0"))  # seconds, doubled per attempt
+MAX_BACKOFF = 60.0
+POOL_SIZE = int(os.getenv("LINEAR_POOL_SIZE", "8"))
+
+# Server errors worth retrying. Mutations are only retried on rate limits,
+# since a 5xx or timeout may have been applied already (e.g. a created issue).
+RETRY_STATUS = {500, 502, 503, 504}
+
+session = requests.Session()
+session.headers.update({
+    "Authorization": API_KEY or "",
+    "Content-Type": "application/json"
+})
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# Counters for the current process; read them, or print format_stats()
+stats = {
+    "requests": 0,
+    "retries": 0,
+    "latency": 0.0,      # total seconds spent waiting on responses
+    "max_latency": 0.0,
+    "complexity": 0,     # sum of X-Complexity over all requests
+    "throttled": 0.0,    # seconds slept because of rate limits
+    "requests_remaining": None,
+    "complexity_remaining": None,
+}
+_stats_lock = threading.Lock()
+_reset_at = 0.0  # epoch seconds before which the rate-limit budget is exhausted
+
+
+def _header_int(response, name):
+    try:
+        return int(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _record_response(response, elapsed):
+    """Update counters and the rate-limit window from a response."""
+    global _reset_at
+    requests_remaining = _header_int(response, "X-RateLimit-Requests-Remaining")
+    complexity_remaining = _header_int(response, "X-RateLimit-Complexity-Remaining")
+
+    with _stats_lock:
+        stats["requests"] += 1
+        stats["latency"] += elapsed
+        stats["max_latency"] = max(stats["max_latency"], elapsed)
+        stats["complexity"] += _header_int(response, "X-Complexity") or 0
+        if requests_remaining is not None:
+            stats["requests_remaining"] = requests_remaining
+        if complexity_remaining is not None:
+            stats["complexity_remaining"] = complexity_remaining
+
+        # Reset headers are epoch milliseconds
+        for remaining, reset_header in (
+            (requests_remaining, "X-RateLimit-Requests-Reset"),
+            (complexity_remaining, "X-RateLimit-Complexity-Reset"),
+        ):
+            reset = _header_int(response, reset_header)
+            if remaining is not None and remaining <= 0 and reset:
+                _reset_at = max(_reset_at, reset / 1000.0)
+
+
+def _wait_for_budget():
+    """Sleep until the rate-limit window resets if the last response exhausted it."""
+    delay = min(_reset_at - time.time(), MAX_BACKOFF)
+    if delay > 0:
+        with _stats_lock:
+            stats["throttled"] += delay
+        time.sleep(delay)
+
+
+def _is_rate_limited(response):
+    """Linear reports rate limits as HTTP 429 or as a 400 with a RATELIMITED error."""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 400:
+        return False
+    try:
+        errors = response.json().get("errors", [])
+    except ValueError:
+        return False
+    return any((e.get("extensions") or {}).get("code") == "RATELIMITED" for e in errors)
+
+
+def _backoff(attempt, response=None):
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    delay = min(MAX_BACKOFF, BACKOFF_BASE * (2 ** attempt))
+    delay += random.uniform(0, delay / 4)
+    if response is not None:
+        retry_after = _header_int(response, "Retry-After")
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        delay = max(delay, min(_reset_at - time.time(), MAX_BACKOFF))
+    return delay
+
+
+def graphql_query(query, variables=None, raise_on_errors=True):
+    """
+    Execute a GraphQL query/mutation and return the decoded response.
+
+    Raises on non-200 responses once retries are exhausted, and on GraphQL
+    errors unless raise_on_errors is False (for aliased batch queries where
+    some aliases may legitimately fail, e.g. an unknown identifier).
+    """
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+    is_mutation = query.lstrip().startswith("mutation")
+
+    attempt = 0
+    while True:
+        _wait_for_budget()
+        start = time.perf_counter()
+        try:
+            with profiling.span("graphql", mutation=is_mutation, attempt=attempt) as span:
+                if linear_replay.MODE == "replay":
+                    if linear_replay.LATENCY:
+                        time.sleep(linear_replay.LATENCY)
+                    response = linear_replay.replay(payload, URL)
+                else:
+                    response = session.post(URL, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                    if linear_replay.MODE == "record" and not _is_rate_limited(response):
+                        linear_replay.record(payload, response)
+                if profiling.ENABLED:
+                    sent = len(response.request.body or b"")
+                    span.set(status=response.status_code, bytes_sent=sent,
+                             bytes_received=len(response.content))
+                    profiling.count("bytes_sent", sent)
+        except (requests.ConnectionError, requests.Timeout):
+            if is_mutation or attempt >= MAX_RETRIES:
+                raise
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            with _stats_lock:
+                stats["retries"] += 1
+            continue
+
+        _record_response(response, time.perf_counter() - start)
+
+        retryable = _is_rate_limited(response) or (
+            response.status_code in RETRY_STATUS and not is_mutation
+        )
+        if retryable and attempt < MAX_RETRIES:
+            delay = _backoff(attempt, response)
+            with _stats_lock:
+                stats["retries"] += 1
+                stats["throttled"] += delay
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        if response.status_code != 200:
+            raise Exception(f"GraphQL request failed: {response.status_code} {response.text}")
+        result = response.json()
+        if raise_on_errors and "errors" in result:
+            raise Exception(f"GraphQL errors: {result['errors']}")
+        return result
+
+
+def format_stats():
+    """One-line summary of the API usage so far in this process."""
+    with _stats_lock:
+        s = dict(stats)
+    count = s["requests"]
+    avg = s["latency"] / count if count else 0.0
+    line = (f"Linear API: {count} request(s), {s['retries']} retry(ies), "
+            f"avg {avg * 1000:.0f} ms, max {s['max_latency'] * 1000:.0f} ms, "
+            f"complexity {s['complexity']}")
+    if s["throttled"]:
+        line += f", throttled {s['throttled']:.1f}s"
+    if s["requests_remaining"] is not None:
+        line += f", {s['requests_remaining']} requests left in window"
+    return line
@@ -0,0 +1,97 @@
+"""
+Cached Linear workspace metadata: teams and workflow states.
+
+Teams and workflow states rarely change, so they are fetched once and kept in
+METADATA_FILE for METADATA_TTL seconds (LINEAR_METADATA_TTL in .env) instead
+of being looked up on every run. Refresh explicitly with
+`python fetch_linear_info.py --refresh`.
+"""
+
+import os
+import json
+import time
+import threading
+from linear_client import graphql_query
+
+METADATA_FILE = os.path.join(".linear_sync", "metadata.json")
+METADATA_TTL = int(os.getenv("LINEAR_METADATA_TTL", str(24 * 60 * 60)))
+# Workflow state types of finished issues
+FINISHED_STATE_TYPES = ("completed", "canceled")
+
+METADATA_QUERY = """
+query {
+  teams {
+    nodes {
+      id
+      name
+      key
+    }
+  }
+  workflowStates {
+    nodes {
+        id
+        name
+        type
+        team {
+            id
+        }
+    }
+  }
+}
+"""
+
+_metadata = None
+_lock = threading.Lock()
+
+
+def load_cached_metadata():
+    try:
+        with open(METADATA_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_metadata(metadata):
+    os.makedirs(os.path.dirname(METADATA_FILE), exist_ok=True)
+    with open(METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+def fetch_metadata():
+    """Fetch teams and workflow states from Linear and cache them on disk."""
+    global _metadata
+    data = graphql_query(METADATA_QUERY).get("data", {})
+    metadata = {
+        "fetchedAt": time.time(),
+        "teams": data.get("teams", {}).get("nodes", []),
+        "states": [
+            {"id": s["id"], "name": s["name"], "type": s["type"], "team": (s.get("team") or {}).get("id")}
+            for s in data.get("workflowStates", {}).get("nodes", [])
+        ],
+    }
+    save_cached_metadata(metadata)
+    _metadata = metadata
+    return metadata
+
+
+def get_metadata(refresh=False):
+    """Cached metadata, fetched again if missing, older than METADATA_TTL, or refresh is set."""
+    global _metadata
+    with _lock:
+        if _metadata is None:
+            _metadata = load_cached_metadata()
+        expired = not _metadata or time.time() - _metadata.get("fetchedAt", 0) > METADATA_TTL
+        if refresh or expired:
+            fetch_metadata()
+        return _metadata
+
+
+def default_team_id():
+    """LINEAR_TEAM_ID from .env, or the workspace's first team."""
+    team_id = os.getenv("LINEAR_TEAM_ID")
+    if team_id:
+        return team_id
+    teams = get_metadata()["teams"]
+    return teams[0]["id"] if teams else None
+
@@ -0,0 +1,114 @@
+"""
+Record/replay of Linear GraphQL traffic, used by linear_client.graphql_query.
+
+LINEAR_RECORD_MODE=record sends requests as usual and saves every answered
+request (rate-limit rejections excluded) under LINEAR_RECORD_DIR, one JSON
+file per normalized request. LINEAR_RECORD_MODE=replay answers from those
+files instead of the network, optionally delayed by LINEAR_REPLAY_LATENCY
+milliseconds, so the scripts can be run, tested and benchmarked offline.
+
+Requests are normalized before matching: whitespace in the query is
+collapsed, variables are compared as sorted JSON, and variables that change
+on every run (VOLATILE_VARIABLES, e.g. delta-sync timestamps) are left out.
+A request sent several times in one recording keeps each response in order;
+replay serves them in the same order and repeats the last one.
+
+    LINEAR_RECORD_MODE=record python sync_linear.py
+    LINEAR_RECORD_MODE=replay LINEAR_REPLAY_LATENCY=20 python sync_linear.py
+"""
+
+import os
+import json
+import hashlib
+import threading
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODES = ("record", "replay")
+MODE = os.getenv("LINEAR_RECORD_MODE", "").lower() or None
+RECORD_DIR = os.getenv("LINEAR_RECORD_DIR", os.path.join(".linear_sync", "recordings"))
+LATENCY = float(os.getenv("LINEAR_REPLAY_LATENCY", "0")) / 1000  # seconds
+VOLATILE_VARIABLES = {"since"}
+# Response headers worth keeping: rate-limit budget and query complexity
+KEPT_HEADERS = ("retry-after", "x-complexity")
+KEPT_HEADER_PREFIX = "x-ratelimit-"
+
+if MODE is not None and MODE not in MODES:
+    raise ValueError(f"LINEAR_RECORD_MODE must be one of {', '.join(MODES)}, not {MODE!r}")
+
+_lock = threading.Lock()
+_recorded = set()  # keys whose file this process has started over
+_served = {}  # key -> responses replayed so far
+
+
+def normalize(payload):
+    """Request as matched against recordings: collapsed query, stable variables."""
+    variables = {k: v for k, v in (payload.get("variables") or {}).items() if k not in VOLATILE_VARIABLES}
+    return {"query": " ".join(payload["query"].split()), "variables": variables}
+
+
+def request_key(payload):
+    text = json.dumps(normalize(payload), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:20]
+
+
+def recording_path(key):
+    return os.path.join(RECORD_DIR, key + ".json")
+
+
+def record(payload, response):
+    """Append a live response to its request's recording."""
+    try:
+        body = response.json()
+    except ValueError:
+        return  # not a GraphQL answer (proxy error page, ...)
+    # Header names are case-insensitive; servers may send them lowercase
+    headers = {name: value for name, value in response.headers.items()
+               if name.lower() in KEPT_HEADERS or name.lower().startswith(KEPT_HEADER_PREFIX)}
+    entry = {"status": response.status_code, "headers": headers, "body": body}
+
+    key = request_key(payload)
+    path = recording_path(key)
+    with _lock:
+        if key in _recorded:
+            with open(path, "r", encoding="utf-8") as f:
+                recording = json.load(f)
+        else:
+            # First time this run: replace what an earlier recording left
+            _recorded.add(key)
+            recording = {"request": normalize(payload), "responses": []}
+        recording["responses"].append(entry)
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(recording, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def replay(payload, url):
+    """
+    The recorded response for a request, as a requests.Response so callers
+    handle it exactly like a live one. Raises if nothing was recorded.
+    """
+    key = request_key(payload)
+    try:
+        with open(recording_path(key), "r", encoding="utf-8") as f:
+            responses = json.load(f)["responses"]
+    except FileNotFoundError:
+        query = " ".join(payload["query"].split())
+        raise Exception(f"No recorded response for request {key} in {RECORD_DIR} "
+                        f"(record it with LINEAR_RECORD_MODE=record): {query[:120]}")
+    with _lock:
+        served = _served.get(key, 0)
+        _served[key] = served + 1
+    entry = responses[min(served, len(responses) - 1)]
+
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers.update(entry["headers"])
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(entry["body"], ensure_ascii=False).encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    response.request = requests.Request("POST", url, json=payload).prepare()
+    return response
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Linear GraphQL API, for benchmarks and offline runs.
+
+Understands the operations the sync scripts send: teams/workflowStates,
+aliased issue(id:) lookups, paginated issues(...) with the state-type and
+updatedAt filters, and aliased issueCreate/issueUpdate/commentCreate mutations.
+Every response can be delayed by a fixed latency, and a request-count rate
+limit answers like Linear does (HTTP 400 RATELIMITED plus X-RateLimit-* headers).
+
+Point the scripts at it with LINEAR_API_URL:
+
+    python mock_linear.py --port 8765 --issues 200 --latency 50
+    LINEAR_API_URL=http://127.0.0.1:8765/graphql LINEAR_API_KEY=x python sync_linear.py
+"""
+
+import re
+import json
+import time
+import uuid
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+TEAM = {"id": "mock-team", "name": "Pacemaker", "key": "PAC"}
+STATES = [
+    {"id": "mock-backlog", "name": "Backlog", "type": "backlog"},
+    {"id": "mock-todo", "name": "Todo", "type": "unstarted"},
+    {"id": "mock-progress", "name": "In Progress", "type": "started"},
+    {"id": "mock-done", "name": "Done", "type": "completed"},
+    {"id": "mock-canceled", "name": "Canceled", "type": "canceled"},
+]
+# alias: field(args) for the root fields this server implements
+FIELD_RE = re.compile(r'(?:(\w+)\s*:\s*)?\b(issueCreate|issueUpdate|commentCreate|issues|issue)\s*\(([^()]*)\)')
+COMPLEXITY_PER_FIELD = 10
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class MockLinear:
+    """In-memory workspace plus request counters, shared by all handler threads."""
+
+    def __init__(self, latency=0.0, rate_limit=None, rate_window=60.0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.issues = {}  # identifier -> issue
+        self.by_uuid = {}
+        self.comments = []
+        self.lock = threading.Lock()
+        self.next_number = 1
+        self.window_start = time.time()
+        self.window_count = 0
+        self.stats = {"requests": 0, "rate_limited": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def add_issue(self, title, description="", state_type="unstarted"):
+        with self.lock:
+            return self._add_issue(title, description, state_type)
+
+    def _add_issue(self, title, description, state_type):
+        identifier = f"{TEAM['key']}-{self.next_number}"
+        self.next_number += 1
+        state = next(s for s in STATES if s["type"] == state_type)
+        issue = {
+            "id": str(uuid.uuid4()),
+            "identifier": identifier,
+            "title": title,
+            "description": description,
+            "url": f"https://linear.app/mock/issue/{identifier}/",
+            "team": {"id": TEAM["id"]},
+            "state": {"name": state["name"], "type": state["type"]},
+            "priorityLabel": "No priority",
+            "dueDate": None,
+            "assignee": None,
+            "project": None,
+            "archivedAt": None,
+            "updatedAt": now_iso(),
+        }
+        self.issues[identifier] = issue
+        self.by_uuid[issue["id"]] = issue
+        return issue
+
+    def set_state(self, identifier, state_type):
+        with self.lock:
+            state = next(s for s in STATES if s["type"] == state_type)
+            issue = self.issues[identifier]
+            issue["state"] = {"name": state["name"], "type": state["type"]}
+            issue["updatedAt"] = now_iso()
+
+    def check_rate_limit(self):
+        """Count a request; returns (allowed, headers)."""
+        if self.rate_limit is None:
+            return True, {}
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.rate_window:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            remaining = self.rate_limit - self.window_count
+            headers = {
+                "X-RateLimit-Requests-Limit": str(self.rate_limit),
+                "X-RateLimit-Requests-Remaining": str(max(remaining, 0)),
+                "X-RateLimit-Requests-Reset": str(int((self.window_start + self.rate_window) * 1000)),
+            }
+            return remaining >= 0, headers
+
+    def execute(self, query, variables):
+        """Run one GraphQL document; returns (data, errors, fields executed)."""
+        data, errors = {}, []
+        fields = 0
+        if re.search(r'\bteams\b', query):
+            data["teams"] = {"nodes": [TEAM]}
+            fields += 1
+        if re.search(r'\bworkflowStates\b', query):
+            data["workflowStates"] = {"nodes": [dict(s, team={"id": TEAM["id"]}) for s in STATES]}
+            fields += 1
+
+        with self.lock:
+            for alias, field, args in FIELD_RE.findall(query):
+                key = alias or field
+                fields += 1
+                try:
+                    data[key] = getattr(self, "_" + field)(args, variables, query)
+                except LookupError as e:
+                    data[key] = None
+                    errors.append({"message": str(e), "path": [key],
+                                   "extensions": {"code": "INVALID_INPUT"}})
+        return data, errors, fields
+
+    def _arg(self, args, name, variables):
+        match = re.search(name + r'\s*:\s*(\$\w+|"[^"]*"|\w+)', args)
+        if not match:
+            return None
+        token = match.group(1)
+        if token.startswith("$"):
+            return variables.get(token[1:])
+        if token.startswith('"'):
+            return json.loads(token)
+        return int(token) if token.isdigit() else token
+
+    def _find(self, key):
+        issue = self.issues.get(key) or self.by_uuid.get(key)
+        if not issue:
+            raise LookupError(f"Entity not found: Issue {key}")
+        return issue
+
+    def _issue(self, args, variables, query):
+        return self._find(self._arg(args, "id", variables))
+
+    def _issueCreate(self, args, variables, query):
+        data = self._arg(args, "input", variables) or {}
+        if not data.get("title") or not data.get("teamId"):
+            raise LookupError("Argument Validation Error: title and teamId are required")
+        issue = self._add_issue(data["title"], data.get("description", ""), "backlog")
+        return {"success": True, "issue": issue}
+
+    def _issueUpdate(self, args, variables, query):
+        issue = self._find(self._arg(args, "id", variables))
+        data = self._arg(args, "input", variables) or {}
+        issue.update({k: v for k, v in data.items() if k in ("title", "description")})
+        issue["updatedAt"] = now_iso()
+        return {"success": True, "issue": issue}
+
+    def _commentCreate(self, args, variables, query):
+        data = self._arg(args, "input", variables) or {}
+        issue = self._find(data.get("issueId"))
+        comment = {"id": str(uuid.uuid4()), "body": data.get("body", ""), "issue": {"id": issue["id"]}}
+        self.comments.append(comment)
+        return {"success": True, "comment": comment}
+
+    def _issues(self, args, variables, query):
+        first = self._arg(args, "first", variables) or 50
+        after = self._arg(args, "after", variables)
+        nodes = sorted(self.issues.values(), key=lambda i: int(i["identifier"].split("-")[1]))
+        if "includeArchived" not in args:
+            nodes = [i for i in nodes if not i["archivedAt"]]
+        excluded = re.search(r'type\s*:\s*\{\s*nin\s*:\s*(\[[^\]]*\])', query)
+        if excluded:
+            types = json.loads(excluded.group(1))
+            nodes = [i for i in nodes if i["state"]["type"] not in types]
+        if re.search(r'name\s*:\s*\{\s*neq\s*:\s*"Done"', query):
+            nodes = [i for i in nodes if i["state"]["name"] != "Done"]
+        since = variables.get("since")
+        if since and "updatedAt" in query:
+            nodes = [i for i in nodes if i["updatedAt"] > since]
+        start = int(after) if after else 0
+        page = nodes[start:start + first]
+        has_next = start + first < len(nodes)
+        return {"nodes": page, "pageInfo": {"hasNextPage": has_next, "endCursor": str(start + len(page))}}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        linear = self.server.linear
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if linear.latency:
+            time.sleep(linear.latency)
+
+        allowed, headers = linear.check_rate_limit()
+        if not allowed:
+            with linear.lock:
+                linear.stats["rate_limited"] += 1
+            self.reply(400, {"errors": [{"message": "Rate limit exceeded",
+                                         "extensions": {"code": "RATELIMITED"}}]}, headers, len(body))
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.reply(400, {"errors": [{"message": "Invalid JSON body"}]}, headers, len(body))
+            return
+        data, errors, fields = linear.execute(payload.get("query", ""), payload.get("variables") or {})
+        result = {"data": data}
+        if errors:
+            result["errors"] = errors
+        headers["X-Complexity"] = str(fields * COMPLEXITY_PER_FIELD)
+        self.reply(200, result, headers, len(body))
+
+    def reply(self, status, result, headers, bytes_in):
+        out = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        with self.server.linear.lock:
+            stats = self.server.linear.stats
+            stats["requests"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += len(out)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+def start(host="127.0.0.1", port=0, latency=0.0, rate_limit=None, rate_window=60.0):
+    """Start the server on a background thread; returns it (URL in server.url)."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.linear = MockLinear(latency, rate_limit, rate_window)
+    server.url = f"http://{host}:{server.server_port}/graphql"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Linear GraphQL API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--issues", type=int, default=0, help="Issues to seed (every 4th one is Done)")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests allowed per window")
+    parser.add_argument("--rate-window", type=float, default=60, help="Rate-limit window in seconds")
+    args = parser.parse_args()
+
+    server = start(args.host, args.port, args.latency / 1000, args.rate_limit, args.rate_window)
+    for n in range(args.issues):
+        server.linear.add_issue(f"Mock issue {n + 1}", state_type="completed" if n % 4 == 3 else "unstarted")
+    print(f"Mock Linear API on {server.url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,194 @@
+"""
+Header metadata of email/meeting notes.
+
+Notes start with a header block, followed by the body:
+
+    # Email: Subject line          (or "# Meeting: ...")
+
+    - **To**: someone              (meeting notes use **Date**)
+    - **Linear Issue**: https://linear.app/...
+
+parse_header() reads that block in one pass and stops at the first body line,
+so read_header() never loads the rest of the file. write_link() patches the
+Linear link into the header and splices it in front of the unchanged body.
+
+Notes laid out differently (fields not written as bullets, a "## Info"
+heading before them, ...) have an empty header block; for those the whole
+note is scanned for "**Label**:" fields instead, and the "header" then
+covers the entire note.
+
+Each note type is described by a spec dict:
+- kind: word after "#" in the title line ("Email", "Meeting")
+- link_labels: labels holding the issue link, preferred one first; the
+  others are rewritten to the first when the link is written back
+- insert_after: field the link line is added after when there is none
+"""
+
+import io
+import re
+
+TITLE_RE = re.compile(r'^#\s+(\w+):\s*(.*?)\s*$')
+FIELD_RE = re.compile(r'^(\s*-\s+)\*\*([^*]+)\*\*:[ \t]*(.*?)\s*$')
+# "**Label**: value" anywhere in a line, for notes without a bullet header
+LOOSE_FIELD_RE = re.compile(r'^(.*?)\*\*([^*]+)\*\*:[ \t]*(.*?)\s*$')
+LINK_RE = re.compile(r'https://linear\.app/\S+')
+
+
+def parse_header(lines, spec):
+    """
+    Parse the header block from an iterable of lines (kept with their line
+    endings). Returns a dict with:
+    - title: title text, or None
+    - fields: {label: value}
+    - field_lines: {label: index into lines}
+    - lines: the header lines themselves
+    - text: "".join(lines), the exact prefix of the note the header covers
+    """
+    header = {"title": None, "fields": {}, "field_lines": {}, "lines": []}
+    for line in lines:
+        field = FIELD_RE.match(line)
+        if field:
+            label = field.group(2).strip()
+            if label not in header["fields"]:
+                header["fields"][label] = field.group(3)
+                header["field_lines"][label] = len(header["lines"])
+        elif not line.strip():
+            # A blank line after the fields closes the block
+            if header["fields"]:
+                header["lines"].append(line)
+                break
+        elif header["title"] is None and not header["fields"] and TITLE_RE.match(line):
+            match = TITLE_RE.match(line)
+            if match.group(1) == spec["kind"]:
+                header["title"] = match.group(2)
+        else:
+            break  # first body line
+        header["lines"].append(line)
+    header["text"] = "".join(header["lines"])
+    return header
+
+
+def scan_fields(content, spec):
+    """
+    Header for a note whose fields are not in a bullet block: the first
+    "**Label**:" of each label and the first title line anywhere in the note.
+    Returns None if the note has no such fields either.
+    """
+    header = {"title": None, "fields": {}, "field_lines": {}, "lines": []}
+    for line in io.StringIO(content, newline=''):
+        field = LOOSE_FIELD_RE.match(line)
+        if field:
+            label = field.group(2).strip()
+            if label not in header["fields"]:
+                header["fields"][label] = field.group(3)
+                header["field_lines"][label] = len(header["lines"])
+        elif header["title"] is None:
+            match = TITLE_RE.match(line)
+            if match and match.group(1) == spec["kind"]:
+                header["title"] = match.group(2)
+        header["lines"].append(line)
+    if not header["fields"]:
+        return None
+    header["text"] = content
+    return header
+
+
+def read_header(filepath, spec):
+    """Parse a note's header, reading the file only up to the end of the block."""
+    # newline='' keeps line endings as-is, so the header length matches the file
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        header = parse_header(f, spec)
+        if header["fields"]:
+            return header
+        f.seek(0)
+        return scan_fields(f.read(), spec) or header
+
+
+def parse_note(content, spec):
+    """Parse the header of note text that is already in memory."""
+    header = parse_header(io.StringIO(content, newline=''), spec)
+    if header["fields"]:
+        return header
+    return scan_fields(content, spec) or header
+
+
+def note_title(header, spec):
+    """Issue title for a note, e.g. "[Email] Subject line"."""
+    kind = spec["kind"]
+    if header["title"]:
+        return f"[{kind}] {header['title']}"
+    return f"[{kind}] {kind} Note"
+
+
+def note_link(header, spec):
+    """(label, url) of the note's Linear link, or (None, None) if it has none."""
+    for label in spec["link_labels"]:
+        match = LINK_RE.match(header["fields"].get(label, ""))
+        if match:
+            return label, match.group(0)
+    return None, None
+
+
+def patch_link(header, url, spec):
+    """Header text with the link set to `url` under the preferred label."""
+    label = spec["link_labels"][0]
+    lines = list(header["lines"])
+    newline = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+    existing = [header["field_lines"][l] for l in spec["link_labels"] if l in header["field_lines"]]
+    if existing:
+        idx = existing[0]
+        prefix = LOOSE_FIELD_RE.match(lines[idx]).group(1)
+        lines[idx] = f"{prefix}**{label}**: {url}{newline}"
+        return "".join(lines)
+
+    new_line = f"- **{label}**: {url}{newline}"
+    if header["field_lines"]:
+        if spec["insert_after"] in header["field_lines"]:
+            idx = header["field_lines"][spec["insert_after"]] + 1
+        else:
+            idx = max(header["field_lines"].values()) + 1
+        # Match the neighbouring field's style ("- **Date**:" or plain "**Date**:")
+        prefix = LOOSE_FIELD_RE.match(lines[idx - 1]).group(1)
+        if re.fullmatch(r'\s*(?:[-*+]\s+)?', prefix):
+            new_line = f"{prefix}**{label}**: {url}{newline}"
+    else:
+        # No metadata yet: start a field list at the end of the header
+        idx = len(lines)
+        if lines and lines[-1].strip():
+            new_line = newline + new_line
+        new_line += newline
+    if idx and not lines[idx - 1].endswith(("\n", "\r")):
+        lines[idx - 1] += newline
+    lines.insert(idx, new_line)
+    return "".join(lines)
+
+
+def write_link(filepath, header, url, spec, content=None):
+    """
+    Write the link back into the note.
+
+    With `content` (the note as already read by the caller) the file is
+    written in one go without reading it again, and the new text is returned.
+    Without it, the file is patched in place: a same-size header is
+    overwritten, otherwise only the bytes after the header are moved.
+    """
+    new_header = patch_link(header, url, spec)
+    if content is not None:
+        new_content = new_header + content[len(header["text"]):]
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            f.write(new_content)
+        return new_content
+
+    old_size = len(header["text"].encode('utf-8'))
+    new_bytes = new_header.encode('utf-8')
+    with open(filepath, 'r+b') as f:
+        if len(new_bytes) == old_size:
+            f.write(new_bytes)
+            return None
+        f.seek(old_size)
+        body = f.read()
+        f.seek(0)
+        f.write(new_bytes + body)
+        f.truncate()
+    return None
@@ -0,0 +1,507 @@
+"""
+Shared Linear sync pipeline for the email and meeting note scripts.
+
+sync_email_linear.py and sync_meeting_linear.py only differ in their note
+header spec (see note_header.py); the Linear side lives here:
+- Issue identifiers (PAC-123) for every linked note in a run are resolved to
+  UUIDs with one aliased query, and cached in ISSUE_ID_CACHE_FILE
+- Updates are sent as aliased issueUpdate mutations, UPDATE_BATCH_SIZE per request
+- New notes are created with aliased issueCreate mutations, CREATE_BATCH_SIZE
+  per request; their links are written back once all batches are done
+- Notes whose content hash matches the last sync (SYNC_STATE_FILE) are skipped,
+  and so are updates whose title/description would not change the issue
+- Notes over LARGE_NOTE_SIZE characters can be uploaded as a summary plus a
+  link, or (append-only edits) have just the new part posted as a comment
+- Batches and issue creations run on a bounded thread pool (`jobs`); rate
+  limits are shared across threads by linear_client
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import profiling
+from linear_client import graphql_query
+from linear_metadata import default_team_id
+from note_header import parse_note, note_title, note_link, write_link
+
+# Local state kept between runs (not committed)
+STATE_DIR = ".linear_sync"
+ISSUE_ID_CACHE_FILE = os.path.join(STATE_DIR, "issue_ids.json")
+# note path -> {"hash", "size", "body", "issue", "updatedAt"} as of the last
+# successful sync; "body" is the hash of the title/description last sent
+SYNC_STATE_FILE = os.path.join(STATE_DIR, "notes.json")
+# Aliases per request; updates carry whole note bodies so they get smaller batches
+RESOLVE_BATCH_SIZE = 50
+UPDATE_BATCH_SIZE = 10
+CREATE_BATCH_SIZE = 10
+COMMENT_BATCH_SIZE = 10
+# What to send for notes longer than LARGE_NOTE_SIZE characters:
+# "full" body, a "summary" (header, opening excerpt and a link to the note), or
+# "comment": when the note only grew since the last sync, post the new part as
+# a comment instead of re-sending the description
+LARGE_NOTE_MODES = ("full", "summary", "comment")
+LARGE_NOTE_MODE = os.getenv("LINEAR_LARGE_NOTE_MODE", "full")
+LARGE_NOTE_SIZE = int(os.getenv("LINEAR_LARGE_NOTE_SIZE", "20000"))
+SUMMARY_SIZE = 2000  # characters of body kept in a summary
+# Where summaries link to, e.g. https://github.com/<org>/<repo>/blob/main/
+NOTES_BASE_URL = os.getenv("NOTES_BASE_URL")
+# Concurrent requests per run; keep at or below LINEAR_POOL_SIZE
+DEFAULT_JOBS = int(os.getenv("LINEAR_SYNC_JOBS", "4"))
+
+_state_lock = threading.Lock()
+
+
+def load_json(path, default):
+    """Load a JSON state file, falling back to default if missing or corrupt."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """Atomically write a JSON state file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def chunks(items, size):
+    """Split a list into consecutive lists of at most `size` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_parallel(func, items, jobs=1):
+    """Return [func(item) for item in items], running up to `jobs` at a time."""
+    if jobs <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+def get_team_id():
+    """Team new issues go to: LINEAR_TEAM_ID from .env, or the first team (cached)."""
+    return default_team_id()
+
+
+def create_issue(title, description, team_id):
+    """Create a new Linear Issue in Backlog."""
+    return create_issues([(title, description)], team_id)[0]
+
+
+def create_issues(creates, team_id, jobs=1):
+    """
+    Create several issues in Backlog with aliased issueCreate mutations.
+
+    `creates` is a list of (title, description); returns, in the same order,
+    the created issue ({id, url, identifier, updatedAt}) or None if that
+    creation failed. Batches are sent up to `jobs` at a time.
+    """
+    batches = chunks([(title, description, team_id) for title, description in creates], CREATE_BATCH_SIZE)
+    results = run_parallel(_create_batch, batches, jobs)
+    return [issue for batch in results for issue in batch]
+
+
+def _create_batch(batch):
+    params = []
+    fields = []
+    variables = {}
+    for idx, (title, description, team_id) in enumerate(batch):
+        params.append(f"$input{idx}: IssueCreateInput!")
+        fields.append(f"  c{idx}: issueCreate(input: $input{idx}) "
+                      "{ success issue { id url identifier updatedAt } }")
+        variables[f"input{idx}"] = {"title": title, "description": description, "teamId": team_id}
+
+    mutation = f"mutation IssueCreates({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+    try:
+        # One rejected note must not hide the others' new issues
+        data = graphql_query(mutation, variables, raise_on_errors=False).get("data") or {}
+    except Exception as e:
+        # Mutations are not retried on server errors, so report the batch as failed
+        # rather than losing the links of other batches that did go through
+        print(f"Error: issue creation request failed: {e}")
+        data = {}
+    results = []
+    for idx in range(len(batch)):
+        payload = data.get(f"c{idx}") or {}
+        results.append(payload.get("issue") if payload.get("success") else None)
+    return results
+
+
+def update_issue(issue_id, title, description):
+    """Update an existing Linear Issue."""
+    return update_issues([(issue_id, title, description)])[0] is not None
+
+
+def update_issues(updates, jobs=1):
+    """
+    Update several issues with aliased issueUpdate mutations.
+
+    `updates` is a list of (issue_uuid, title, description); returns, in the
+    same order, the updated issue ({id, identifier, updatedAt}) or None if that
+    update failed. Bodies travel as variables, so no escaping is needed.
+    Batches are sent up to `jobs` at a time.
+    """
+    results = run_parallel(_update_batch, chunks(updates, UPDATE_BATCH_SIZE), jobs)
+    return [issue for batch in results for issue in batch]
+
+
+def _update_batch(batch):
+    params = []
+    fields = []
+    variables = {}
+    for idx, (issue_id, title, description) in enumerate(batch):
+        params.append(f"$id{idx}: String!, $input{idx}: IssueUpdateInput!")
+        fields.append(f"  u{idx}: issueUpdate(id: $id{idx}, input: $input{idx}) "
+                      "{ success issue { id identifier updatedAt } }")
+        variables[f"id{idx}"] = issue_id
+        variables[f"input{idx}"] = {"title": title, "description": description}
+
+    mutation = f"mutation IssueUpdates({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+    try:
+        # One rejected update must not hide the others' results
+        data = graphql_query(mutation, variables, raise_on_errors=False).get("data") or {}
+    except Exception as e:
+        # Report the batch as failed and let the other batches finish
+        print(f"Error: issue update request failed: {e}")
+        data = {}
+    results = []
+    for idx in range(len(batch)):
+        payload = data.get(f"u{idx}") or {}
+        results.append(payload.get("issue") if payload.get("success") else None)
+    return results
+
+
+def create_comments(comments, jobs=1):
+    """
+    Post comments with aliased commentCreate mutations.
+
+    `comments` is a list of (issue_uuid, body); returns, in the same order,
+    whether each comment was created.
+    """
+    results = run_parallel(_comment_batch, chunks(comments, COMMENT_BATCH_SIZE), jobs)
+    return [ok for batch in results for ok in batch]
+
+
+def _comment_batch(batch):
+    params = []
+    fields = []
+    variables = {}
+    for idx, (issue_id, body) in enumerate(batch):
+        params.append(f"$input{idx}: CommentCreateInput!")
+        fields.append(f"  c{idx}: commentCreate(input: $input{idx}) {{ success }}")
+        variables[f"input{idx}"] = {"issueId": issue_id, "body": body}
+
+    mutation = f"mutation CommentCreates({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+    try:
+        data = graphql_query(mutation, variables, raise_on_errors=False).get("data") or {}
+    except Exception as e:
+        print(f"Error: comment creation request failed: {e}")
+        data = {}
+    return [bool((data.get(f"c{idx}") or {}).get("success")) for idx in range(len(batch))]
+
+
+def resolve_issue_ids(identifiers, jobs=1):
+    """
+    Map issue identifiers (PAC-123) to UUIDs.
+
+    Known identifiers come from the local cache; the rest are fetched with
+    aliased issue(id: ...) queries, up to `jobs` at a time. Unknown
+    identifiers are left out.
+    """
+    cache = load_json(ISSUE_ID_CACHE_FILE, {})
+    missing = sorted({i for i in identifiers if i not in cache})
+
+    for found in run_parallel(_resolve_batch, chunks(missing, RESOLVE_BATCH_SIZE), jobs):
+        cache.update(found)
+
+    if missing:
+        save_json(ISSUE_ID_CACHE_FILE, cache)
+    return {i: cache[i] for i in identifiers if i in cache}
+
+
+def _resolve_batch(batch):
+    query_lines = ["query IssueIds {"]
+    for idx, identifier in enumerate(batch):
+        query_lines.append(f'  i{idx}: issue(id: {json.dumps(identifier)}) {{ id identifier }}')
+    query_lines.append("}")
+
+    try:
+        # Unknown identifiers come back as per-alias errors; keep the rest
+        result = graphql_query("\n".join(query_lines), raise_on_errors=False)
+    except Exception as e:
+        # Leave this batch unresolved so the rest of the run still goes ahead
+        print(f"Error: issue lookup request failed: {e}")
+        result = {}
+    found = {}
+    for idx, identifier in enumerate(batch):
+        issue = (result.get("data") or {}).get(f"i{idx}")
+        if issue and issue.get("id"):
+            found[identifier] = issue["id"]
+    return found
+
+
+def forget_issue_ids(identifiers):
+    """Drop cached UUIDs (e.g. after an update failed because the issue is gone)."""
+    cache = load_json(ISSUE_ID_CACHE_FILE, {})
+    if any(cache.pop(i, None) for i in identifiers):
+        save_json(ISSUE_ID_CACHE_FILE, cache)
+
+
+def extract_issue_identifier(url):
+    """Extract issue identifier (e.g. PAC-123) from Linear URL."""
+    # URL format: https://linear.app/workspace/issue/PAC-123/title
+    match = re.search(r'/issue/([a-zA-Z0-9-]+)', url)
+    if match:
+        return match.group(1)
+    return None
+
+
+def content_hash(content):
+    """Hash of a note's text, used to detect changes since the last sync."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def body_hash(title, description):
+    """Hash of what an issue was last given, to skip updates that change nothing."""
+    return content_hash(f"{title}\0{description}")
+
+
+def summarize(note):
+    """Compact description for a large note: its header, an excerpt and a link to the whole note."""
+    header = note["header"]["text"]
+    if len(header) == len(note["content"]) and note["header"]["field_lines"]:
+        # Fields scanned from the whole note (no bullet header): keep the note
+        # up to its last field line as the header, not all of it
+        last = max(note["header"]["field_lines"].values())
+        header = "".join(note["header"]["lines"][:last + 1])
+    body = note["content"][len(header):]
+    excerpt = body[:SUMMARY_SIZE]
+    # Cut at a paragraph (or line) break so the excerpt doesn't end mid-sentence
+    cut = excerpt.rfind("\n\n")
+    if cut < SUMMARY_SIZE // 2:
+        cut = excerpt.rfind("\n")
+    if cut > SUMMARY_SIZE // 2:
+        excerpt = excerpt[:cut]
+    path = note["path"].replace(os.sep, "/")
+    location = f"[{path}]({NOTES_BASE_URL.rstrip('/')}/{path})" if NOTES_BASE_URL else f"`{path}`"
+    # No sizes or dates here: edits past the excerpt must leave the summary unchanged
+    return f"{header}{excerpt.rstrip()}\n\n---\n_Excerpt of a longer note; full text in {location}._"
+
+
+def note_description(note, large_notes):
+    """Issue description for a note under the given large-note mode."""
+    if large_notes == "summary" and len(note["content"]) > LARGE_NOTE_SIZE:
+        return summarize(note)
+    return note["content"]
+
+
+def appended_text(note, synced):
+    """
+    The text added to the end of a note since it was last synced, or None if
+    the note was edited anywhere else (or not synced with a known size).
+    """
+    size = synced.get("size") if synced else None
+    content = note["content"]
+    if not size or len(content) <= size or content_hash(content[:size]) != synced["hash"]:
+        return None
+    return content[size:].strip() or None
+
+
+def record_synced(state, note, issue, body=None):
+    """
+    Remember the note's current content as synced to `issue`. `body` is the
+    body_hash() of the title/description the issue now has (None: unchanged).
+    """
+    with _state_lock:
+        previous = state.get(note["path"]) or {}
+        state[note["path"]] = {
+            "hash": content_hash(note["content"]),
+            "size": len(note["content"]),
+            "body": body or previous.get("body"),
+            "issue": issue.get("identifier") or note["ident"],
+            "updatedAt": issue.get("updatedAt") or previous.get("updatedAt"),
+        }
+
+
+def write_note_link(note, url, spec):
+    """Write the issue link into the note's header, keeping note["content"] current."""
+    with profiling.span("note.write_link", path=note["path"]):
+        note["content"] = write_link(note["path"], note["header"], url, spec, note["content"])
+    note["header"] = parse_note(note["content"], spec)
+
+
+def sync_notes(md_files, spec, force=False, jobs=DEFAULT_JOBS, large_notes=LARGE_NOTE_MODE):
+    """
+    Sync note files to Linear Issues.
+
+    `spec` describes the note type's header (see note_header.py).
+    Notes unchanged since the last sync are skipped unless `force` is set, as
+    are updates that would leave the issue's title/description as they are.
+    `large_notes` picks what is sent for notes over LARGE_NOTE_SIZE (see
+    LARGE_NOTE_MODES).
+    Up to `jobs` requests are in flight at once.
+    Linked notes are resolved and updated in batches, unlinked notes get a new
+    issue whose URL is written back into the file. Per-file output is printed
+    at the end, in file order.
+    """
+    state = load_json(SYNC_STATE_FILE, {})
+    notes = []
+    skipped = 0
+    for filepath in md_files:
+        with profiling.span("note.read", path=filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+            synced = state.get(filepath)
+            unchanged = not force and synced and synced["hash"] == content_hash(content)
+            if not unchanged:
+                header = parse_note(content, spec)
+                label, url = note_link(header, spec)
+        if unchanged:
+            skipped += 1
+            continue
+        notes.append({
+            "path": filepath,
+            "content": content,
+            "header": header,
+            "title": note_title(header, spec),
+            "url": url,
+            "label": label,
+            "ident": None,
+            "log": [],
+        })
+
+    # Forget notes that no longer exist
+    for path in [p for p in state if p not in md_files and not os.path.exists(p)]:
+        del state[path]
+
+    profiling.count("notes.skipped", skipped)
+    if skipped:
+        print(f"Skipping {skipped} unchanged note(s) (use --force to re-upload)")
+    try:
+        _sync(notes, state, spec, jobs, force, large_notes)
+    finally:
+        save_json(SYNC_STATE_FILE, state)
+
+    for note in notes:
+        print(f"\nProcessing: {os.path.basename(note['path'])}")
+        for line in note["log"]:
+            print(line)
+
+
+def _sync(notes, state, spec, jobs, force=False, large_notes=LARGE_NOTE_MODE):
+    """Push changed notes to Linear, recording each success in `state`."""
+    to_update = []
+    to_create = []
+    for note in notes:
+        note["description"] = note_description(note, large_notes)
+        if not note["url"]:
+            to_create.append(note)
+            continue
+        note["ident"] = extract_issue_identifier(note["url"])
+        if not note["ident"]:
+            note["log"].append(f"  ✗ Could not extract issue identifier from URL")
+            continue
+
+        synced = state.get(note["path"])
+        note["body"] = body_hash(note["title"], note["description"])
+        if large_notes == "comment" and len(note["content"]) > LARGE_NOTE_SIZE:
+            note["comment"] = appended_text(note, synced)
+        if note.get("comment"):
+            note["log"].append(f"  Adding new section to {note['ident']} as a comment")
+        elif not force and synced and synced.get("body") == note["body"]:
+            note["log"].append(f"  - Issue {note['ident']} already has this description")
+            _synced(note, state, spec, {}, None)
+            profiling.count("notes.unchanged")
+            continue
+        else:
+            note["log"].append(f"  Updating existing issue: {note['ident']}")
+        to_update.append(note)
+
+    # Update existing issues: one lookup for all identifiers, then batched mutations
+    if to_update:
+        print(f"Resolving {len(to_update)} linked issue(s)...")
+    with profiling.span("sync.resolve", notes=len(to_update)):
+        issue_ids = resolve_issue_ids([note["ident"] for note in to_update], jobs)
+    ready = []
+    for note in to_update:
+        if note["ident"] in issue_ids:
+            ready.append(note)
+        else:
+            note["log"].append(f"  ✗ Could not find issue with identifier: {note['ident']}")
+    commenting = [n for n in ready if n.get("comment")]
+    ready = [n for n in ready if not n.get("comment")]
+
+    with profiling.span("sync.update", notes=len(ready)):
+        results = update_issues([(issue_ids[n["ident"]], n["title"], n["description"]) for n in ready], jobs)
+
+    # A cached UUID may be stale (issue moved or recreated): re-resolve and retry once
+    stale = [n for n, issue in zip(ready, results) if issue is None]
+    if stale:
+        forget_issue_ids([n["ident"] for n in stale])
+        fresh_ids = resolve_issue_ids([n["ident"] for n in stale], jobs)
+        retry = [n for n in stale if fresh_ids.get(n["ident"]) not in (None, issue_ids[n["ident"]])]
+        retried = update_issues([(fresh_ids[n["ident"]], n["title"], n["description"]) for n in retry], jobs)
+        retried = dict(zip([id(n) for n in retry], retried))
+        results = [retried.get(id(n), issue) for n, issue in zip(ready, results)]
+
+    with profiling.span("sync.comment", notes=len(commenting)):
+        posted = create_comments([(issue_ids[n["ident"]], n["comment"]) for n in commenting], jobs)
+
+    failed = []
+    for note, issue in zip(ready, results):
+        if issue:
+            note["log"].append(f"  ✓ Updated successfully")
+            profiling.count("notes.updated")
+            _synced(note, state, spec, issue, note["body"])
+        else:
+            note["log"].append(f"  ✗ Update failed")
+            profiling.count("notes.failed")
+            failed.append(note["ident"])
+    for note, ok in zip(commenting, posted):
+        if ok:
+            note["log"].append(f"  ✓ Comment added")
+            profiling.count("notes.commented")
+            _synced(note, state, spec, {}, None)
+        else:
+            note["log"].append(f"  ✗ Comment failed")
+            profiling.count("notes.failed")
+            failed.append(note["ident"])
+    forget_issue_ids(failed)
+
+    # Create new issues for unlinked notes; the team is only needed here
+    team_id = get_team_id() if to_create else None
+    if to_create and not team_id:
+        print("Error: Could not find a team in Linear.")
+        return
+
+    for note in to_create:
+        note["log"].append(f"  Creating new issue in Backlog...")
+    with profiling.span("sync.create", notes=len(to_create)):
+        issues = create_issues([(note["title"], note["description"]) for note in to_create], team_id, jobs)
+
+    # Write the new links into the notes once every batch has come back
+    for note, issue in zip(to_create, issues):
+        if issue and issue.get("url"):
+            note["log"].append(f"  ✓ Created: {issue['identifier']} ({issue['url']})")
+            profiling.count("notes.created")
+            write_note_link(note, issue["url"], spec)
+            note["log"].append(f"  ✓ Updated {os.path.basename(note['path'])} with Linear Issue link")
+            record_synced(state, note, issue, body_hash(note["title"], note["description"]))
+        else:
+            note["log"].append(f"  ✗ Failed to create issue")
+            profiling.count("notes.failed")
+
+
+def _synced(note, state, spec, issue, body):
+    """Finish a linked note that is in sync with its issue."""
+    # Also ensure the file uses the "Linear Issue" label (e.g. instead of "Linear Doc")
+    if note["label"] != spec["link_labels"][0]:
+        write_note_link(note, note["url"], spec)
+    record_synced(state, note, issue, body)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Linear's webhook delivery.
+
+Posts recorded webhook payloads (e.g. webhook_samples/*.json) to a running
+`python update_status.py --serve`, re-stamped with the current time and signed
+with LINEAR_WEBHOOK_SECRET the same way Linear does.
+"""
+
+import os
+import hmac
+import json
+import time
+import hashlib
+import argparse
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEBHOOK_SECRET = os.getenv("LINEAR_WEBHOOK_SECRET")
+
+
+def post_payload(url, payload, secret, identifier=None, state_type=None):
+    """Sign and post one payload. Returns the receiver's (status, text)."""
+    payload = dict(payload)
+    payload["webhookTimestamp"] = int(time.time() * 1000)
+    if identifier or state_type:
+        payload["data"] = dict(payload.get("data") or {})
+        if identifier:
+            payload["data"]["identifier"] = identifier
+        if state_type:
+            payload["data"]["state"] = dict(payload["data"].get("state") or {}, type=state_type)
+
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    response = requests.post(url, data=body, timeout=10, headers={
+        "Content-Type": "application/json",
+        "Linear-Event": payload.get("type", ""),
+        "Linear-Signature": signature,
+    })
+    return response.status_code, response.text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Post recorded Linear webhook payloads to a local receiver.")
+    parser.add_argument("payloads", nargs="+", help="JSON files with recorded webhook payloads")
+    parser.add_argument("--url", default="http://127.0.0.1:8787/", help="Receiver URL")
+    parser.add_argument("--identifier", help="Override data.identifier (e.g. PAC-12)")
+    parser.add_argument("--state-type", help="Override data.state.type (e.g. completed)")
+    args = parser.parse_args()
+
+    if not WEBHOOK_SECRET:
+        print("Error: LINEAR_WEBHOOK_SECRET not found in .env")
+        exit(1)
+
+    for path in args.payloads:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        status, text = post_payload(args.url, payload, WEBHOOK_SECRET, args.identifier, args.state_type)
+        print(f"{path}: {status} {text}")
@@ -0,0 +1,146 @@
+"""
+Optional timing instrumentation shared by all scripts.
+
+Off by default; the hooks then cost one attribute check each. Enable with
+LINEAR_PROFILE=1 in the environment or a script's --profile flag. When on:
+- span(name, **fields) times a block (Linear requests, note reads/writes,
+  report parsing, sync stages, ...)
+- record(name, seconds) adds a duration timed elsewhere (worker processes)
+- count(name, n) bumps a counter (notes skipped/updated/created, bytes sent)
+- every span is appended to LINEAR_PROFILE_TRACE as a JSON line, if set
+- a summary (count, total, p50/p95 per span, counters) is printed at exit
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import multiprocessing
+
+ENABLED = False
+TRACE_FILE = None
+
+_lock = threading.Lock()
+_durations = {}  # span name -> [seconds, ...]
+_counters = {}
+_trace = None
+
+
+class _NullSpan:
+    """What span() returns when profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        record(self.name, time.perf_counter() - self.start, **self.fields)
+        return False
+
+    def set(self, **fields):
+        """Attach fields known only once the block ran (status, sizes, ...)."""
+        self.fields.update(fields)
+
+
+def enable(trace_file=None):
+    """Turn profiling on for this process (and child processes, via the environment)."""
+    global ENABLED, TRACE_FILE
+    # Worker processes inherit LINEAR_PROFILE; only the main process prints a summary
+    if not ENABLED and multiprocessing.parent_process() is None:
+        atexit.register(print_summary)
+    ENABLED = True
+    TRACE_FILE = trace_file or os.getenv("LINEAR_PROFILE_TRACE")
+    os.environ["LINEAR_PROFILE"] = "1"
+    if TRACE_FILE:
+        os.environ["LINEAR_PROFILE_TRACE"] = TRACE_FILE
+
+
+def span(name, **fields):
+    """Context manager timing a block under `name`."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, fields)
+
+
+def record(name, seconds, **fields):
+    """Add a duration measured elsewhere (e.g. in a worker process) under `name`."""
+    if not ENABLED:
+        return
+    with _lock:
+        _durations.setdefault(name, []).append(seconds)
+    if TRACE_FILE:
+        _write_trace({"span": name, "ts": time.time(), "ms": round(seconds * 1000, 3), **fields})
+
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def _write_trace(record):
+    global _trace
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _lock:
+        if _trace is None:
+            _trace = open(TRACE_FILE, "a", encoding="utf-8")
+        _trace.write(line)
+        _trace.flush()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def format_summary():
+    with _lock:
+        durations = {name: list(values) for name, values in _durations.items()}
+        counters = dict(_counters)
+    lines = ["--- Profile ---",
+             f"{'span':<24} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9}"]
+    for name in sorted(durations):
+        values = durations[name]
+        lines.append(f"{name:<24} {len(values):>6} {sum(values):>9.3f} "
+                     f"{percentile(values, 50) * 1000:>9.1f} {percentile(values, 95) * 1000:>9.1f}")
+    for name in sorted(counters):
+        value = counters[name]
+        if name.startswith("bytes"):
+            lines.append(f"{name}: {value / 1024:.1f} KB")
+        else:
+            lines.append(f"{name}: {value}")
+    if TRACE_FILE:
+        lines.append(f"Trace written to {TRACE_FILE}")
+    return "\n".join(lines)
+
+
+def print_summary():
+    if _durations or _counters:
+        print(f"\n{format_summary()}")
+
+
+if os.getenv("LINEAR_PROFILE", "").lower() not in ("", "0", "false", "no"):
+    enable()
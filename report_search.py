@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Search the report archive from scripts, the command line or a local HTTP endpoint.
+
+Reads the compact index update_index.py writes (search-inverted.json): term
+postings with title/tag-weighted frequencies plus each report's weighted
+length. Queries are split with the same Korean-aware tokenizer as the index
+(update_index.tokenize) and matched like the landing page does (Hangul bigrams
+exactly, a lone syllable inside any term, Latin words by prefix); a report must
+match every query token. Hits are ranked with BM25 and come with highlighted
+snippets. Report text is only loaded for hits being shown, from the search/
+shard holding it when the index is sharded, else from search-index.json.
+
+Repeated queries are served from an LRU cache, which is dropped when the index
+file changes.
+
+    python report_search.py "비영리 설립"
+    python report_search.py --serve --port 8788    # GET /search?q=...&limit=10
+"""
+
+import os
+import sys
+import json
+import html
+import math
+import time
+import bisect
+import argparse
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from update_index import tokenize, HANGUL_RE, INDEX_FILE, INVERTED_INDEX_FILE, SHARD_DIR
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# BM25 parameters: term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+CACHE_SIZE = 256  # queries kept by the LRU cache
+SNIPPET_PADDING = 60  # characters of context on each side of a match
+SNIPPET_CHUNKS = 3
+
+
+class ReportSearch:
+    """A loaded index. search() results are cached until the index file changes."""
+
+    def __init__(self, base_dir=BASE_DIR, cache_size=CACHE_SIZE):
+        self.base_dir = base_dir
+        self.inverted_file = os.path.join(base_dir, INVERTED_INDEX_FILE)
+        self.search = lru_cache(maxsize=cache_size)(self._search)
+        self.mtime = None
+        self.load()
+
+    def load(self):
+        with open(self.inverted_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.mtime = os.stat(self.inverted_file).st_mtime_ns
+        self.docs = index["docs"]
+        self.terms = index["terms"]
+        self.term_list = sorted(self.terms)
+        self.hangul_terms = [t for t in self.term_list if HANGUL_RE.match(t)]
+        self.avg_len = sum(doc["len"] for doc in self.docs) / max(len(self.docs), 1)
+        self.contents = {}  # report id -> text, filled as hits need snippets
+        self.search.cache_clear()
+
+    def refresh(self):
+        """Reload if update_index.py rewrote the index since it was loaded."""
+        if os.stat(self.inverted_file).st_mtime_ns != self.mtime:
+            self.load()
+
+    def lookup(self, token):
+        """Postings lists matching one query token."""
+        if HANGUL_RE.match(token):
+            if len(token) > 1:
+                return [self.terms[token]] if token in self.terms else []
+            return [self.terms[t] for t in self.hangul_terms if token in t]
+        start = bisect.bisect_left(self.term_list, token)
+        matches = []
+        for term in self.term_list[start:]:
+            if not term.startswith(token):
+                break
+            matches.append(self.terms[term])
+        return matches
+
+    def rank(self, query):
+        """[(doc index, BM25 score)] of reports matching every query token, best first."""
+        total = len(self.docs)
+        scores = None
+        for token in dict.fromkeys(tokenize(query)):
+            token_scores = {}
+            for postings in self.lookup(token):
+                df = len(postings) // 2
+                idf = _idf(total, df)
+                for i in range(0, len(postings), 2):
+                    doc, tf = postings[i], postings[i + 1]
+                    norm = 1 - BM25_B + BM25_B * self.docs[doc]["len"] / self.avg_len
+                    token_scores[doc] = token_scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc: score + token_scores[doc] for doc, score in scores.items() if doc in token_scores}
+            if not scores:
+                break
+        return sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+
+    def content(self, doc):
+        """Full text of a report, loading its shard (or the whole index) on first use."""
+        if doc["id"] not in self.contents:
+            if doc.get("shard"):
+                with open(os.path.join(self.base_dir, SHARD_DIR, doc["shard"]), "r", encoding="utf-8") as f:
+                    self.contents.update(json.load(f))
+            else:
+                with open(os.path.join(self.base_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+                    self.contents.update({r["id"]: r["content"] for r in json.load(f)})
+        return self.contents.get(doc["id"], "")
+
+    def _search(self, query, limit=10, offset=0):
+        """(total hits, results) for a query; use search(), which is cached."""
+        # A limit below 1 (or a negative offset) would slice from the end of the ranking
+        limit, offset = max(1, limit), max(0, offset)
+        ranked = self.rank(query)
+        results = []
+        for doc_index, score in ranked[offset:offset + limit]:
+            doc = self.docs[doc_index]
+            results.append({
+                "id": doc["id"],
+                "title": doc["title"],
+                "date": doc["date"],
+                "tags": doc["tags"],
+                "url": doc["url"],
+                "score": round(score, 4),
+                "snippet": make_snippet(self.content(doc), query),
+            })
+        return len(ranked), tuple(results)
+
+
+def _idf(total, df):
+    # Lucene's variant, which stays positive for terms found in most reports
+    return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+
+def make_snippet(text, query, mark=("\x00", "\x01"), padding=SNIPPET_PADDING, max_chunks=SNIPPET_CHUNKS):
+    """
+    Up to `max_chunks` passages around literal matches of the query's words,
+    with each match wrapped in the `mark` pair. Falls back to the opening text
+    when no word occurs literally (e.g. only a bigram matched).
+    """
+    lower = text.lower()
+    spans = []
+    for word in set(query.lower().split()):
+        pos = lower.find(word)
+        while pos != -1:
+            spans.append((pos, pos + len(word)))
+            pos = lower.find(word, pos + len(word))
+    if not spans:
+        opening = " ".join(text[:padding * 2].split())
+        return opening + ("…" if len(text) > padding * 2 else "")
+
+    chunks = []  # [start, end, [match spans]]
+    for start, end in sorted(spans):
+        lo, hi = max(0, start - padding), min(len(text), end + padding)
+        if chunks and lo <= chunks[-1][1]:
+            chunks[-1][1] = max(chunks[-1][1], hi)
+            chunks[-1][2].append((start, end))
+        else:
+            chunks.append([lo, hi, [(start, end)]])
+    best = sorted(sorted(chunks, key=lambda c: -len(c[2]))[:max_chunks])
+
+    passages = []
+    for lo, hi, matches in best:
+        parts = []
+        pos = lo
+        for start, end in matches:
+            start = max(start, pos)  # overlapping matches of different words
+            if end <= start:
+                continue
+            parts.extend((text[pos:start], mark[0], text[start:end], mark[1]))
+            pos = end
+        parts.append(text[pos:hi])
+        passage = " ".join("".join(parts).split())
+        passages.append(("…" if lo > 0 else "") + passage + ("…" if hi < len(text) else ""))
+    return " ".join(passages)
+
+
+def render_snippet(snippet, start, end, escape=None):
+    """Replace make_snippet()'s placeholder marks, escaping the text first if needed."""
+    if escape:
+        snippet = escape(snippet)
+    return snippet.replace("\x00", start).replace("\x01", end)
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """GET /search?q=<query>&limit=<n>&offset=<n> -> JSON results with <mark>ed snippets."""
+
+    def do_GET(self):
+        # http.server decodes the request line as Latin-1; recover raw UTF-8 (unencoded Hangul)
+        url = urlparse(self.path.encode("latin-1").decode("utf-8", "replace"))
+        if url.path != "/search":
+            self.reply(404, {"error": "Not found"})
+            return
+        params = parse_qs(url.query)
+        query = (params.get("q") or [""])[0].strip()
+        try:
+            limit = max(1, min(int((params.get("limit") or ["10"])[0]), 100))
+            offset = max(int((params.get("offset") or ["0"])[0]), 0)
+        except ValueError:
+            self.reply(400, {"error": "limit and offset must be integers"})
+            return
+        if not query:
+            self.reply(400, {"error": "Missing q parameter"})
+            return
+
+        engine = self.server.engine
+        start = time.perf_counter()
+        engine.refresh()
+        total, results = engine.search(query, limit, offset)
+        results = [dict(r, snippet=render_snippet(r["snippet"], "<mark>", "</mark>", html.escape))
+                   for r in results]
+        self.reply(200, {
+            "query": query,
+            "total": total,
+            "results": results,
+            "ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+
+    def reply(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+def serve(engine, host, port):
+    server = ThreadingHTTPServer((host, port), SearchHandler)
+    server.engine = engine
+    print(f"Serving report search on http://{host}:{port}/search?q=... (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the report archive (BM25 over search-inverted.json).")
+    parser.add_argument("query", nargs="*", help="Search terms")
+    parser.add_argument("--base-dir", default=BASE_DIR, help="Folder containing the search index")
+    parser.add_argument("--limit", "-n", type=int, default=10, help="Number of results")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP endpoint instead")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP endpoint address")
+    parser.add_argument("--port", type=int, default=8788, help="HTTP endpoint port")
+    args = parser.parse_args()
+
+    try:
+        engine = ReportSearch(args.base_dir)
+    except OSError as e:
+        print(f"Error: could not load the search index ({e}). Run update_index.py first.")
+        exit(1)
+
+    if args.serve:
+        serve(engine, args.host, args.port)
+        exit(0)
+    if not args.query:
+        parser.error("a query is required unless --serve is given")
+
+    query = " ".join(args.query)
+    total, results = engine.search(query, args.limit)
+    if args.json:
+        results = [dict(r, snippet=render_snippet(r["snippet"], "**", "**")) for r in results]
+        print(json.dumps({"query": query, "total": total, "results": results}, ensure_ascii=False, indent=2))
+        exit(0)
+
+    mark = ("\033[1;33m", "\033[0m") if sys.stdout.isatty() else ("**", "**")
+    print(f"{total} report(s) match \"{query}\"")
+    for rank, r in enumerate(results, 1):
+        date = f" ({r['date']})" if r["date"] else ""
+        print(f"\n{rank}. {r['title']}{date}  score {r['score']:.2f}")
+        print(f"   {r['url']}")
+        print(f"   {render_snippet(r['snippet'], *mark)}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Linear Sync Daemon
+
+Long-running alternative to invoking sync_email_linear.py, sync_meeting_linear.py,
+sync_linear.py and update_status.py one by one. A single process keeps the HTTP
+session, the team ID and the issue ID cache warm across all work.
+- Polls email_notes/ and meeting_notes/ for changed files (mtime snapshots)
+- Waits until a burst of edits has been quiet for DEBOUNCE seconds, then syncs
+  only the changed notes with their folder's pipeline
+- Optionally runs the TODO.md delta sync and the status refresh on an interval
+
+Stop with Ctrl+C.
+"""
+
+import os
+import glob
+import time
+import argparse
+from linear_client import format_stats
+from note_sync import sync_notes, DEFAULT_JOBS
+from sync_email_linear import EMAIL_NOTES_DIR, EMAIL_NOTE
+from sync_meeting_linear import MEETING_NOTES_DIR, MEETING_NOTE
+from sync_linear import sync_todo
+from update_status import refresh_statuses
+import profiling
+
+# Watched folder -> header spec of its notes
+SOURCES = {EMAIL_NOTES_DIR: EMAIL_NOTE, MEETING_NOTES_DIR: MEETING_NOTE}
+POLL_INTERVAL = float(os.getenv("LINEAR_DAEMON_POLL", "1"))  # seconds between scans
+DEBOUNCE = float(os.getenv("LINEAR_DAEMON_DEBOUNCE", "2"))  # quiet time before a sync
+
+
+def snapshot(directory):
+    """{path: mtime} of the notes in a folder, templates (_*.md) excluded."""
+    mtimes = {}
+    for path in glob.glob(os.path.join(directory, "*.md")):
+        if os.path.basename(path).startswith("_"):
+            continue
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass  # deleted between glob and stat
+    return mtimes
+
+
+def log(message):
+    print(f"\n[{time.strftime('%H:%M:%S')}] {message}")
+
+
+def run_job(name, func):
+    """Run one unit of work; a failure is reported and retried on the next change/interval."""
+    try:
+        func()
+    except Exception as e:
+        print(f"Error: {name} failed: {e}")
+
+
+def dispatch(paths, jobs):
+    """Sync changed notes, grouped by folder."""
+    for directory, spec in SOURCES.items():
+        batch = sorted(p for p in paths if os.path.dirname(p) == directory)
+        if batch:
+            log(f"{len(batch)} changed note(s) in {directory}/")
+            with profiling.span("daemon.dispatch", folder=directory, notes=len(batch)):
+                run_job(f"{directory} sync", lambda: sync_notes(batch, spec, jobs=jobs))
+
+
+def watch(jobs=DEFAULT_JOBS, todo_interval=0, status_interval=0):
+    """
+    Watch the note folders until interrupted. Every note is checked once at
+    startup (unchanged ones are skipped by their content hash). Intervals of 0
+    disable the TODO sync and the status refresh.
+    """
+    snapshots = {directory: {} for directory in SOURCES}
+    pending = {}  # path -> time its last change was seen
+    next_todo = time.monotonic() if todo_interval else None
+    next_status = time.monotonic() if status_interval else None
+
+    while True:
+        now = time.monotonic()
+        for directory in SOURCES:
+            current = snapshot(directory)
+            for path, mtime in current.items():
+                if snapshots[directory].get(path) != mtime:
+                    pending[path] = now
+            snapshots[directory] = current
+
+        ready = [path for path, seen in pending.items() if now - seen >= DEBOUNCE]
+        if ready:
+            for path in ready:
+                del pending[path]
+            dispatch(ready, jobs)
+            # Writing a new issue link back changes the file; that is not an edit
+            for path in ready:
+                directory = os.path.dirname(path)
+                try:
+                    snapshots[directory][path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    snapshots[directory].pop(path, None)
+
+        if next_todo is not None and now >= next_todo:
+            log("Syncing TODO.md")
+            run_job("TODO sync", lambda: sync_todo(delta=True))
+            next_todo = time.monotonic() + todo_interval
+        if next_status is not None and now >= next_status:
+            log("Refreshing meeting note statuses")
+            run_job("Status refresh", lambda: refresh_statuses(jobs=jobs))
+            next_status = time.monotonic() + status_interval
+
+        time.sleep(POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch note folders and sync changes to Linear.")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS,
+                        help="Maximum number of concurrent Linear requests")
+    parser.add_argument("--todo-interval", type=float, default=0,
+                        help="Seconds between TODO.md delta syncs (0 = off)")
+    parser.add_argument("--status-interval", type=float, default=0,
+                        help="Seconds between meeting note status refreshes (0 = off)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    for directory in SOURCES:
+        if not os.path.exists(directory):
+            print(f"Warning: {directory} directory not found, watching for it")
+    print(f"Watching {', '.join(SOURCES)} (poll {POLL_INTERVAL:g}s, debounce {DEBOUNCE:g}s). Ctrl+C to stop.")
+    try:
+        watch(args.jobs, args.todo_interval, args.status_interval)
+    except KeyboardInterrupt:
+        pass
+    print(f"\n{format_stats()}")
@@ -9,194 +9,28 @@ Syncs markdown files from email_notes/ folder to Linear as Issues (Backlog).
 """
 
 import os
-import re
 import glob
-import requests
-from dotenv import load_dotenv
+import argparse
+from linear_client import API_KEY, format_stats
+from note_sync import sync_notes, DEFAULT_JOBS, LARGE_NOTE_MODE, LARGE_NOTE_MODES
+import profiling
 
-load_dotenv()
-
-API_KEY = os.getenv("LINEAR_API_KEY")
-TEAM_ID = os.getenv("LINEAR_TEAM_ID") # Should be set in .env or fetched
-URL = "https://api.linear.app/graphql"
 EMAIL_NOTES_DIR = "email_notes"
+# Header of an email note; older notes may still carry a "Linear Doc" link,
+# which is rewritten to "Linear Issue" on the next sync
+EMAIL_NOTE = {
+    "kind": "Email",
+    "link_labels": ("Linear Issue", "Linear Doc"),
+    "insert_after": "To",
+}
 
 if not API_KEY:
     print("Error: LINEAR_API_KEY not found in .env")
     exit(1)
 
-headers = {
-    "Authorization": API_KEY,
-    "Content-Type": "application/json"
-}
-
-
-def graphql_query(query, variables=None):
-    """Execute a GraphQL query/mutation."""
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
-    response = requests.post(URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"GraphQL request failed: {response.status_code} {response.text}")
-    result = response.json()
-    if "errors" in result:
-        raise Exception(f"GraphQL errors: {result['errors']}")
-    return result
-
-
-def get_team_id():
-    """Fetch the first team ID if not set in .env."""
-    global TEAM_ID
-    if TEAM_ID:
-        return TEAM_ID
-    
-    query = """
-    query {
-      teams(first: 1) {
-        nodes {
-          id
-          name
-        }
-      }
-    }
-    """
-    data = graphql_query(query)
-    teams = data.get("data", {}).get("teams", {}).get("nodes", [])
-    if teams:
-        TEAM_ID = teams[0]["id"]
-        return TEAM_ID
-    return None
-
-
-def create_issue(title, description, team_id):
-    """Create a new Linear Issue in Backlog."""
-    mutation = """
-    mutation IssueCreate($input: IssueCreateInput!) {
-      issueCreate(input: $input) {
-        success
-        issue {
-          id
-          url
-          identifier
-        }
-      }
-    }
-    """
-    variables = {
-        "input": {
-            "title": title,
-            "description": description,
-            "teamId": team_id
-        }
-    }
-    
-    result = graphql_query(mutation, variables)
-    issue_data = result.get("data", {}).get("issueCreate", {})
-    if issue_data.get("success"):
-        return issue_data.get("issue", {})
-    return None
-
-
-def update_issue(issue_id, title, description):
-    """Update an existing Linear Issue."""
-    mutation = """
-    mutation IssueUpdate($id: String!, $input: IssueUpdateInput!) {
-      issueUpdate(id: $id, input: $input) {
-        success
-        issue {
-          id
-          url
-          identifier
-        }
-      }
-    }
-    """
-    variables = {
-        "id": issue_id,
-        "input": {
-            "title": title,
-            "description": description
-        }
-    }
-    
-    result = graphql_query(mutation, variables)
-    issue_data = result.get("data", {}).get("issueUpdate", {})
-    return issue_data.get("success", False)
-
-
-def extract_linear_issue_url(content):
-    """Extract Linear Issue URL from markdown content."""
-    # Look for either Doc or Issue tag to maintain backward compatibility during migration if needed, 
-    # but primarily looking for Linear Issue.
-    match = re.search(r'\*\*Linear Issue\*\*:\s*(https://linear\.app/[^\s\n]+)', content)
-    if not match:
-        match = re.search(r'\*\*Linear Doc\*\*:\s*(https://linear\.app/[^\s\n]+)', content)
-    if match:
-        return match.group(1).strip()
-    return None
-
-
-def extract_issue_identifier(url):
-    """Extract issue identifier (e.g. PAC-123) from Linear URL."""
-    # URL format: https://linear.app/workspace/issue/PAC-123/title
-    match = re.search(r'/issue/([a-zA-Z0-9-]+)', url)
-    if match:
-        return match.group(1)
-    return None
-
-
-def extract_title(content):
-    """Extract title from email note markdown."""
-    match = re.search(r'^#\s+Email:\s*(.+)$', content, re.MULTILINE)
-    if match:
-        return f"[Email] {match.group(1).strip()}"
-    return "[Email] Email Note"
-
 
-def update_file_with_linear_url(filepath, linear_url, ident=None):
-    """Update the markdown file with Linear Issue URL."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 1. Update/Add Linear Issue line
-    if "**Linear Issue**:" in content:
-        # Replace empty Linear Issue line
-        updated_content = re.sub(
-            r'(\*\*Linear Issue\*\*:)\s*$',
-            f'\\1 {linear_url}',
-            content,
-            flags=re.MULTILINE
-        )
-    elif "**Linear Doc**:" in content:
-        # Convert Linear Doc to Linear Issue
-        updated_content = re.sub(
-            r'\*\*Linear Doc\*\*:\s*.*',
-            f'**Linear Issue**: {linear_url}',
-            content
-        )
-    else:
-        # Add after the To: line or similar metadata
-        updated_content = re.sub(
-            r'(- \*\*To\*\*:[^\n]*\n)',
-            f'\\1- **Linear Issue**: {linear_url}\n',
-            content
-        )
-    
-    # If no empty line found but we have the tag, try to add after tag
-    if updated_content == content and "**Linear Issue**:" in content:
-         updated_content = re.sub(
-            r'(\*\*Linear Issue\*\*:)\s*\n',
-            f'\\1 {linear_url}\n',
-            content
-        )
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(updated_content)
-
-
-def sync_email_notes():
-    """Main sync function."""
+def sync_email_notes(force=False, jobs=DEFAULT_JOBS, large_notes=LARGE_NOTE_MODE):
+    """Main sync function. Unchanged notes are skipped unless force is set."""
     if not os.path.exists(EMAIL_NOTES_DIR):
         print(f"Error: {EMAIL_NOTES_DIR} directory not found")
         return
@@ -211,69 +45,23 @@ def sync_email_notes():
     
     print(f"Found {len(md_files)} email note(s) to sync...")
     
-    # Get team ID
-    team_id = get_team_id()
-    if not team_id:
-        print("Error: Could not find a team in Linear.")
-        return
-    
-    for filepath in md_files:
-        filename = os.path.basename(filepath)
-        print(f"\nProcessing: {filename}")
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        title = extract_title(content)
-        linear_url = extract_linear_issue_url(content)
-        
-        if linear_url:
-            # Update existing issue
-            ident = extract_issue_identifier(linear_url)
-            if ident:
-                print(f"  Updating existing issue: {ident}")
-                # We need the UUID for update, or we can use identifier if we fetch it first.
-                # Actually IssueUpdate requires the ID (UUID).
-                
-                # Let's fetch the UUID first
-                query = f"""
-                query {{
-                  issue(id: "{ident}") {{
-                    id
-                  }}
-                }}
-                """
-                res = graphql_query(query)
-                issue_uuid = res.get("data", {}).get("issue", {}).get("id")
-                
-                if issue_uuid:
-                    success = update_issue(issue_uuid, title, content)
-                    if success:
-                        print(f"  ✓ Updated successfully")
-                        # Also ensure the file uses "Linear Issue" tag instead of "Linear Doc"
-                        if "**Linear Doc**:" in content:
-                           update_file_with_linear_url(filepath, linear_url)
-                    else:
-                        print(f"  ✗ Update failed")
-                else:
-                    print(f"  ✗ Could not find issue with identifier: {ident}")
-            else:
-                print(f"  ✗ Could not extract issue identifier from URL")
-        else:
-            # Create new issue
-            print(f"  Creating new issue in Backlog...")
-            issue = create_issue(title, content, team_id)
-            if issue and issue.get("url"):
-                new_url = issue["url"]
-                new_ident = issue["identifier"]
-                print(f"  ✓ Created: {new_ident} ({new_url})")
-                
-                # Update the markdown file with the Linear URL
-                update_file_with_linear_url(filepath, new_url, new_ident)
-                print(f"  ✓ Updated {filename} with Linear Issue link")
-            else:
-                print(f"  ✗ Failed to create issue")
+    sync_notes(md_files, EMAIL_NOTE, force=force, jobs=jobs, large_notes=large_notes)
 
 
 if __name__ == "__main__":
-    sync_email_notes()
+    parser = argparse.ArgumentParser(description="Sync email notes to Linear Issues.")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-upload notes even if they have not changed since the last sync")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS,
+                        help="Maximum number of concurrent Linear requests")
+    parser.add_argument("--large-notes", choices=LARGE_NOTE_MODES, default=LARGE_NOTE_MODE,
+                        help="What to upload for very long notes: the full body, a summary "
+                             "with a link, or new sections as comments")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    sync_email_notes(force=args.force, jobs=args.jobs, large_notes=args.large_notes)
+    print(f"\n{format_stats()}")
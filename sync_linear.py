@@ -1,109 +1,258 @@
 import os
-import requests
+import re
 import json
-from dotenv import load_dotenv
+import argparse
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from linear_client import API_KEY, graphql_query, format_stats
+from linear_metadata import FINISHED_STATE_TYPES
+import profiling
 
-load_dotenv()
-
-API_KEY = os.getenv("LINEAR_API_KEY")
 TEAM_ID = os.getenv("LINEAR_TEAM_ID")
-URL = "https://api.linear.app/graphql"
 TODO_FILE = "TODO.md"
+PAGE_SIZE = int(os.getenv("LINEAR_PAGE_SIZE", "50"))
+# Time of the last successful sync, used by --delta
+TODO_STATE_FILE = os.path.join(".linear_sync", "todo.json")
+# Re-fetch a little before the last sync to absorb clock skew; patches are idempotent
+SYNC_OVERLAP = timedelta(minutes=1)
+# "- [ ] [PAC-123](url) ..." lines in TODO.md
+TODO_LINE_RE = re.compile(r'^- \[[ x]\] \[([A-Z]+-\d+)\]\(')
 
 if not API_KEY:
     print("Error: LINEAR_API_KEY or LINEAR_TEAM_ID not found in .env")
     exit(1)
 
-headers = {
-    "Authorization": API_KEY,
-    "Content-Type": "application/json"
+ISSUE_FIELDS = """
+      id
+      identifier
+      title
+      priorityLabel
+      dueDate
+      state {
+        name
+        type
+      }
+      assignee {
+        name
+      }
+      project {
+        name
+      }
+      url
+      archivedAt
+"""
+
+# Issues that are not finished, by state type, so custom state names work too
+ISSUES_QUERY = """
+query ActiveIssues($first: Int!, $after: String) {
+  issues(first: $first, after: $after, filter: { state: { type: { nin: %s } } }) {
+    nodes {%s}
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
 }
+""" % (json.dumps(list(FINISHED_STATE_TYPES)), ISSUE_FIELDS)
 
-def graphql_query(query, variables=None):
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
-    response = requests.post(URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"GraphQL request failed: {response.status_code} {response.text}")
-    return response.json()
-
-def fetch_active_issues():
-    query = """
-    query {
-      issues(first: 50, filter: { state: { name: { neq: "Done" } } }) {
-        nodes {
-          id
-          identifier
-          title
-          priorityLabel
-          dueDate
-          state {
-            name
-          }
-          assignee {
-            name
-          }
-          project {
-            name
-          }
-          url
-        }
-      }
+# Every issue touched since $since, including finished or archived ones
+# so they can be removed from TODO.md
+UPDATED_ISSUES_QUERY = """
+query UpdatedIssues($first: Int!, $after: String, $since: DateTimeOrDuration!) {
+  issues(first: $first, after: $after, includeArchived: true, filter: { updatedAt: { gt: $since } }) {
+    nodes {%s}
+    pageInfo {
+      hasNextPage
+      endCursor
     }
+  }
+}
+""" % ISSUE_FIELDS
+
+def fetch_issues_page(after=None, page_size=PAGE_SIZE, query=ISSUES_QUERY, variables=None):
+    """Fetch one page of issues. Returns (nodes, pageInfo)."""
+    data = graphql_query(query, {**(variables or {}), "first": page_size, "after": after})
+    issues = data.get("data", {}).get("issues", {})
+    return issues.get("nodes", []), issues.get("pageInfo", {})
+
+def iter_issues(page_size=PAGE_SIZE, prefetch=False, query=ISSUES_QUERY, variables=None):
     """
-    data = graphql_query(query)
-    return data.get("data", {}).get("issues", {}).get("nodes", [])
+    Yield every issue matched by query, following the pagination cursor page by
+    page. With prefetch, the next page is requested while the current one is
+    consumed.
+    """
+    if not prefetch:
+        after = None
+        while True:
+            nodes, page_info = fetch_issues_page(after, page_size, query, variables)
+            yield from nodes
+            if not page_info.get("hasNextPage"):
+                return
+            after = page_info["endCursor"]
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(fetch_issues_page, None, page_size, query, variables)
+        while future is not None:
+            nodes, page_info = future.result()
+            future = None
+            if page_info.get("hasNextPage"):
+                future = pool.submit(fetch_issues_page, page_info["endCursor"], page_size, query, variables)
+            yield from nodes
+
+def iter_active_issues(page_size=PAGE_SIZE, prefetch=False):
+    """Yield every issue that belongs in TODO.md."""
+    return iter_issues(page_size, prefetch)
+
+def iter_updated_issues(since, page_size=PAGE_SIZE, prefetch=False):
+    """Yield every issue updated after `since` (ISO 8601), active or not."""
+    return iter_issues(page_size, prefetch, UPDATED_ISSUES_QUERY, {"since": since})
+
+def is_active(issue):
+    """Whether an issue belongs in TODO.md (mirrors the ISSUES_QUERY filter)."""
+    return not issue.get('archivedAt') and issue['state']['type'] not in FINISHED_STATE_TYPES
+
+def fetch_active_issues(page_size=PAGE_SIZE):
+    return list(iter_active_issues(page_size))
+
+def format_issue_line(issue):
+    ident = issue['identifier'] # e.g. PAC-1
+    title = issue['title']
+    state = issue['state']['name']
+    assignee = issue['assignee']['name'] if issue['assignee'] else "Unassigned"
+    url = issue['url']
+    priority = issue['priorityLabel']
+    project = issue['project']['name'] if issue['project'] else "No Project"
+    
+    # Format: - [ ] [PAC-123](url) Title (State, Assignee)
+    checkbox = "[x]" if issue['state']['type'] in FINISHED_STATE_TYPES else "[ ]"
+    
+    line = f"- {checkbox} [{ident}]({url}) **{title}**"
+    meta = []
+    if state: meta.append(f"State: {state}")
+    if priority: meta.append(f"Priority: {priority}")
+    if assignee != "Unassigned": meta.append(f"Assignee: {assignee}")
+    if project: meta.append(f"Project: {project}")
+    
+    if meta:
+        line += f" <br> *({', '.join(meta)})*"
+    return line
 
 def update_todo_file(issues):
-    print(f"Syncing {len(issues)} issues to {TODO_FILE}...")
+    """
+    Regenerate TODO.md from an iterable of issues. Issues are formatted as they
+    arrive (e.g. page by page from iter_active_issues) so only the output lines
+    are kept in memory.
+    """
+    print(f"Syncing issues to {TODO_FILE}...")
     
     # Read existing content to preserve header or manual sections if needed
     # For now, we will regenerate the "Active Issues" section
     
-    new_lines = []
+    header = [
+        "# TODO List",
+        "",
+        "This file is synchronized with Linear. Do not remove the ID tags (e.g. [PAC-123]).",
+        "",
+        "## Active Issues",
+        "",
+    ]
     
-    # Header
-    new_lines.append("# TODO List")
-    new_lines.append("")
-    new_lines.append("This file is synchronized with Linear. Do not remove the ID tags (e.g. [PAC-123]).")
-    new_lines.append("")
-    new_lines.append("## Active Issues")
-    new_lines.append("")
+    issue_lines = [(issue['identifier'], format_issue_line(issue)) for issue in issues]
     
     # Sort issues by identifier for stability
     # Or by priority? Let's do Identifier desc for now (newest first)
-    sorted_issues = sorted(issues, key=lambda x: x['identifier'], reverse=True)
-    
-    for issue in sorted_issues:
-        ident = issue['identifier'] # e.g. PAC-1
-        title = issue['title']
-        state = issue['state']['name']
-        assignee = issue['assignee']['name'] if issue['assignee'] else "Unassigned"
-        url = issue['url']
-        priority = issue['priorityLabel']
-        project = issue['project']['name'] if issue['project'] else "No Project"
-        
-        # Format: - [ ] [PAC-123](url) Title (State, Assignee)
-        checkbox = "[x]" if state.lower() in ["done", "canceled"] else "[ ]"
-        
-        line = f"- {checkbox} [{ident}]({url}) **{title}**"
-        meta = []
-        if state: meta.append(f"State: {state}")
-        if priority: meta.append(f"Priority: {priority}")
-        if assignee != "Unassigned": meta.append(f"Assignee: {assignee}")
-        if project: meta.append(f"Project: {project}")
-        
-        if meta:
-            line += f" <br> *({', '.join(meta)})*"
-            
-        new_lines.append(line)
+    issue_lines.sort(key=lambda x: x[0], reverse=True)
 
     with open(TODO_FILE, "w", encoding="utf-8") as f:
-        f.write("\n".join(new_lines))
+        f.write("\n".join(header + [line for _, line in issue_lines]))
         
-    print(f"Successfully updated {TODO_FILE}")
+    print(f"Successfully updated {TODO_FILE} with {len(issue_lines)} issues")
+
+def patch_todo_file(issues):
+    """
+    Apply changed issues to the existing TODO.md in place: lines are matched by
+    their [PAC-123] tag and replaced, inserted in identifier order, or removed
+    once the issue is finished/archived. The file is only rewritten if a line changed.
+    Returns the number of changed lines.
+    """
+    with open(TODO_FILE, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+
+    positions = {}
+    for i, line in enumerate(lines):
+        match = TODO_LINE_RE.match(line)
+        if match:
+            positions[match.group(1)] = i
+
+    changes = 0
+    for issue in issues:
+        ident = issue['identifier']
+        if ident in positions:
+            idx = positions[ident]
+            new_line = format_issue_line(issue) if is_active(issue) else None
+            if new_line != lines[idx]:
+                lines[idx] = new_line  # None marks the line for removal
+                changes += 1
+        elif is_active(issue):
+            # Same order as update_todo_file: identifier descending
+            after = [i for other, i in positions.items() if other > ident and lines[i] is not None]
+            idx = max(after) + 1 if after else min(positions.values(), default=len(lines))
+            lines.insert(idx, format_issue_line(issue))
+            positions = {other: i + 1 if i >= idx else i for other, i in positions.items()}
+            positions[ident] = idx
+            changes += 1
+
+    if changes:
+        with open(TODO_FILE, "w", encoding="utf-8") as f:
+            f.write("\n".join(line for line in lines if line is not None))
+    return changes
+
+def load_last_sync():
+    try:
+        with open(TODO_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("lastSync")
+    except (OSError, ValueError):
+        return None
+
+def save_last_sync(started):
+    os.makedirs(os.path.dirname(TODO_STATE_FILE), exist_ok=True)
+    with open(TODO_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"lastSync": started}, f)
+
+def sync_todo(delta=False, page_size=PAGE_SIZE, prefetch=False):
+    """
+    Rewrite TODO.md from the active issues, or with `delta` only patch in the
+    issues updated since the last sync (falls back to a full sync the first time).
+    """
+    started = (datetime.now(timezone.utc) - SYNC_OVERLAP).isoformat(timespec="milliseconds")
+    last_sync = load_last_sync() if delta else None
+
+    if last_sync and os.path.exists(TODO_FILE):
+        print(f"Fetching issues updated since {last_sync}...")
+        with profiling.span("todo.patch"):
+            changed = patch_todo_file(iter_updated_issues(last_sync, page_size, prefetch=prefetch))
+        print(f"Patched {changed} line(s) in {TODO_FILE}" if changed else f"{TODO_FILE} is up to date")
+    else:
+        if delta:
+            print("No previous sync recorded, doing a full sync")
+        with profiling.span("todo.full"):
+            update_todo_file(iter_active_issues(page_size, prefetch=prefetch))
+
+    save_last_sync(started)
 
 if __name__ == "__main__":
-    current_issues = fetch_active_issues()
-    update_todo_file(current_issues)
+    parser = argparse.ArgumentParser(description="Sync active Linear issues to TODO.md.")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="Issues per request (Linear allows up to 250)")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Request the next page while the current one is processed")
+    parser.add_argument("--delta", action="store_true",
+                        help="Only fetch issues updated since the last sync and patch TODO.md in place")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    sync_todo(delta=args.delta, page_size=args.page_size, prefetch=args.prefetch)
+    print(format_stats())
@@ -0,0 +1,50 @@
+from note_header import parse_note, read_header, note_title, note_link, write_link
+
+EMAIL_NOTE = {"kind": "Email", "link_labels": ["Linear Issue", "Linear Doc"], "insert_after": "To"}
+MEETING_NOTE = {"kind": "Meeting", "link_labels": ["Linear Issue"], "insert_after": "Date"}
+URL = "https://linear.app/pac/issue/PAC-1/"
+NEW_URL = "https://linear.app/pac/issue/PAC-2/"
+
+
+def test_bullet_header():
+    content = f"# Email: Hello\n\n- **To**: a@example.org\n- **Linear Issue**: {URL}\n\nBody **Note**: x\n"
+    header = parse_note(content, EMAIL_NOTE)
+    assert note_title(header, EMAIL_NOTE) == "[Email] Hello"
+    assert note_link(header, EMAIL_NOTE) == ("Linear Issue", URL)
+    assert header["text"] == content[:content.index("Body")]
+
+
+def test_plain_fields_without_bullets(tmp_path):
+    content = f"# Meeting: Weekly\n\n**Date**: 2026-01-02\n**Linear Issue**: {URL}\n\nNotes\n"
+    header = parse_note(content, MEETING_NOTE)
+    assert note_title(header, MEETING_NOTE) == "[Meeting] Weekly"
+    assert note_link(header, MEETING_NOTE) == ("Linear Issue", URL)
+
+    path = tmp_path / "note.md"
+    path.write_text(content, encoding="utf-8")
+    assert note_link(read_header(path, MEETING_NOTE), MEETING_NOTE) == ("Linear Issue", URL)
+
+    new_content = write_link(path, header, NEW_URL, MEETING_NOTE, content)
+    assert new_content.count("**Linear Issue**") == 1
+    assert f"**Linear Issue**: {NEW_URL}\n" in new_content
+
+
+def test_fields_after_heading(tmp_path):
+    content = "# Email: Hello\n\n## Info\n\n- **To**: a@example.org\n- **Date**: 2026-01-02\n\n## 내용\n\nBody\n"
+    header = parse_note(content, EMAIL_NOTE)
+    assert header["fields"]["To"] == "a@example.org"
+    assert note_link(header, EMAIL_NOTE) == (None, None)
+
+    # Unlinked: the link goes after **To**, once; linking again replaces it
+    path = tmp_path / "note.md"
+    path.write_text(content, encoding="utf-8")
+    write_link(path, read_header(path, EMAIL_NOTE), URL, EMAIL_NOTE)
+    text = path.read_text(encoding="utf-8")
+    assert f"- **To**: a@example.org\n- **Linear Issue**: {URL}\n- **Date**" in text
+    assert text.endswith("## 내용\n\nBody\n")
+
+    header = read_header(path, EMAIL_NOTE)
+    assert note_link(header, EMAIL_NOTE) == ("Linear Issue", URL)
+    write_link(path, header, NEW_URL, EMAIL_NOTE)
+    text = path.read_text(encoding="utf-8")
+    assert text.count("**Linear Issue**") == 1 and NEW_URL in text
@@ -0,0 +1,13 @@
+from note_header import parse_note
+from note_sync import summarize, SUMMARY_SIZE
+
+EMAIL_NOTE = {"kind": "Email", "link_labels": ["Linear Issue", "Linear Doc"], "insert_after": "To"}
+PARAGRAPH = "word " * 20 + "\n\n"
+
+
+def test_summary_of_note_without_bullet_header():
+    content = "# Email: Hello\n\n## Info\n\n**To**: a@example.org\n\n" + PARAGRAPH * 400
+    note = {"content": content, "header": parse_note(content, EMAIL_NOTE), "path": "notes/hello.md"}
+    summary = summarize(note)
+    assert summary.startswith("# Email: Hello\n\n## Info\n\n**To**: a@example.org\n")
+    assert len(summary) < SUMMARY_SIZE + 200
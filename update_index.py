@@ -1,56 +1,670 @@
 import os
+import re
 import json
+import gzip
+import html
+import math
+import time
+import hashlib
+import argparse
+from collections import Counter
+from string import Template
+from datetime import datetime
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
+import profiling
 
-def index_reports():
-    base_dir = "/Users/sehwanlee/Documents/Coding/04 Pacemaker/non-profit/html"
-    index_file = os.path.join(base_dir, "search-index.json")
-    reports = []
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = "/Users/sehwanlee/Documents/Coding/04 Pacemaker/non-profit/html"
+INDEX_FILE = "search-index.json"
+# Per-report mtime/size/content hash from the last run, used by --incremental
+MANIFEST_FILE = "search-index.manifest.json"
+# Precomputed inverted index queried directly by the landing page
+INVERTED_INDEX_FILE = "search-inverted.json"
+# Sharded output: per-report or per-month content shards. The inverted
+# index's document table is the metadata manifest and names each report's shard.
+SHARD_DIR = "search"
+SHARD_MODES = ("report", "month")
+# Landing page report cards, rendered between these markers in the root index.html
+LANDING_PAGE = "index.html"
+CARDS_START = "<!-- report-cards:start -->"
+CARDS_END = "<!-- report-cards:end -->"
+# Hand-curated card fields the parser cannot extract (description, tags,
+# header style) or should override (title, date), keyed by report id
+CARDS_FILE = "report-cards.json"
+# build_assets.py output folder; its copies of the reports are never sources
+DIST_DIR = "dist"
+CARD_TEMPLATE = Template("""
+        <!-- Report $number: $id -->
+        <a href="$url" class="report-card" data-id="$id">
+          <div class="card-header"$header_style>
+            <p class="card-date">$date</p>
+            <h3 class="card-title">$title</h3>
+          </div>
+          <div class="card-body">$description
+            <div class="search-snippet" data-id="$id-snippet"></div>
+            <div class="card-tags">$tags
+            </div>
+          </div>
+          <div class="card-footer">
+            <span class="view-report">보고서 보기</span>
+            <span class="status-badge status-published">Published</span>
+          </div>
+        </a>
+""")
+# Template text that carries nothing searchable ("Section 01" labels)
+SCAFFOLD_RE = re.compile(r"^Section \d+$")
+# A text block is boilerplate (nav, footer, disclaimers) when it repeats in at
+# least this share of reports, and in BOILERPLATE_MIN_REPORTS of them. Shorter
+# blocks are words or phrases split off by markup and are always kept.
+BOILERPLATE_SHARE = 0.8
+BOILERPLATE_MIN_REPORTS = 3
+BOILERPLATE_MIN_CHARS = 20
+# Report dates appear as "January 02, 2026" or "December 2025"
+DATE_FORMATS = ("%B %d, %Y", "%B %Y")
+# "html.parser" and "lxml" go through BeautifulSoup, "stream" uses ReportHTMLParser
+PARSERS = ("html.parser", "lxml", "stream")
+
+# Hangul syllable runs are indexed as character bigrams, everything else as words.
+# index.html tokenizes queries with the same rules.
+TOKEN_RE = re.compile(r"[\uac00-\ud7a3]+|[a-z0-9]+")
+HANGUL_RE = re.compile(r"[\uac00-\ud7a3]")
+# Term-frequency multipliers for matches in the title and tags
+TITLE_WEIGHT = 5
+TAG_WEIGHT = 3
+
+# Elements that never get an end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# Elements whose text BeautifulSoup's get_text() leaves out
+SKIP_ELEMENTS = {"script", "style", "template"}
 
-    # Directories to exclude or search in
-    # For now, let's look at all directories that look like dates or have an index.html
+
+def walk_site(base_dir, exclude=()):
+    """
+    os.walk over the site sources in base_dir, in a stable order. Hidden
+    folders (.git, .agent, ...), the DIST_DIR build output and the folders in
+    exclude are skipped.
+    """
+    excluded = {os.path.abspath(path) for path in (os.path.join(base_dir, DIST_DIR), *exclude)}
     for root, dirs, files in os.walk(base_dir):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith(".") and os.path.abspath(os.path.join(root, d)) not in excluded)
+        yield root, dirs, files
+
+
+def find_reports(base_dir, exclude=()):
+    """Yield (rel_path, html_path) for every report folder under base_dir."""
+    for root, dirs, files in walk_site(base_dir, exclude):
         if "index.html" in files:
             # Skip the root index.html
             if root == base_dir:
                 continue
-            
+
             rel_path = os.path.relpath(root, base_dir)
-            html_path = os.path.join(root, "index.html")
-            
-            with open(html_path, "r", encoding="utf-8") as f:
-                soup = BeautifulSoup(f, "html.parser")
-                
-                # Extract data
-                title = soup.title.string.replace(" | Pacemaker", "") if soup.title else rel_path
-                date_elem = soup.find(class_="report-date")
-                date = date_elem.get_text() if date_elem else ""
-                
-                # Extract all text content
-                # We specifically want text from 'main' or 'container'
-                main_content = soup.find("main")
-                if main_content:
-                    # Clean up the text
-                    text = main_content.get_text(separator=" ", strip=True)
-                else:
-                    text = soup.get_text(separator=" ", strip=True)
-
-                # Extract tags if any
-                tags = [tag.get_text() for tag in soup.find_all(class_="tag")]
-                
-                reports.append({
-                    "id": rel_path,
-                    "title": title,
-                    "date": date,
-                    "tags": tags,
-                    "content": text,
-                    "url": f"./{rel_path}/"
-                })
-
-    with open(index_file, "w", encoding="utf-8") as f:
-        json.dump(reports, f, ensure_ascii=False, indent=2)
-    
-    print(f"Successfully indexed {len(reports)} reports to {index_file}")
+            yield rel_path, os.path.join(root, "index.html")
+
+
+class ReportHTMLParser(HTMLParser):
+    """
+    Streaming extractor for the fields parse_report() needs.
+
+    Collects <title>, the first .report-date, every .tag and the text of the
+    first <main> in a single pass without building a tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0
+        self.stack = []
+        self.skip = 0
+        self.captures = []  # (depth, parts) for elements currently being read
+        self.title = None
+        self.date = None
+        self.tags = []
+        self.main = None
+        self.text = []
+        self.pending = []  # data split across feed() chunks
+
+    def flush(self):
+        """Hand the text collected since the last tag to the open captures."""
+        if not self.pending:
+            return
+        data = "".join(self.pending)
+        self.pending = []
+        self.text.append(data)
+        for _, parts in self.captures:
+            parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in VOID_ELEMENTS:
+            return
+        self.stack.append(tag)
+        self.depth += 1
+        if tag in SKIP_ELEMENTS:
+            self.skip += 1
+
+        classes = (dict(attrs).get("class") or "").split()
+        if tag == "title" and self.title is None:
+            self.title = []
+            self.captures.append((self.depth, self.title))
+        if "report-date" in classes and self.date is None:
+            self.date = []
+            self.captures.append((self.depth, self.date))
+        if "tag" in classes:
+            parts = []
+            self.tags.append(parts)
+            self.captures.append((self.depth, parts))
+        if tag == "main" and self.main is None:
+            self.main = []
+            self.captures.append((self.depth, self.main))
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in VOID_ELEMENTS or tag not in self.stack:
+            return
+        # Close any elements left open inside this one
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.depth -= 1
+            if open_tag in SKIP_ELEMENTS:
+                self.skip -= 1
+            if open_tag == tag:
+                break
+        self.captures = [c for c in self.captures if c[0] <= self.depth]
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.pending.append(data)
+
+    def close(self):
+        super().close()
+        self.flush()
+
+
+def join_text(parts):
+    """Match BeautifulSoup's get_text(separator="\\n", strip=True)."""
+    return "\n".join(s for s in (p.strip() for p in parts) if s)
+
+
+def stream_parse_report(html_path, rel_path):
+    """Parse a report with ReportHTMLParser instead of BeautifulSoup."""
+    parser = ReportHTMLParser()
+    with open(html_path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(65536), ""):
+            parser.feed(chunk)
+    parser.close()
+
+    title = "".join(parser.title).replace(" | Pacemaker", "") if parser.title is not None else rel_path
+    date = "".join(parser.date) if parser.date is not None else ""
+    text = join_text(parser.main if parser.main is not None else parser.text)
+    tags = ["".join(parts) for parts in parser.tags]
+
+    return {
+        "id": rel_path,
+        "title": title,
+        "date": date,
+        "tags": tags,
+        "content": text,
+        "url": f"./{rel_path}/"
+    }
+
+
+def parse_report(html_path, rel_path, parser="html.parser"):
+    """Parse a single report index.html into a search-index record."""
+    if parser == "stream":
+        return stream_parse_report(html_path, rel_path)
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f, parser)
+
+    # Extract data
+    title = soup.title.string.replace(" | Pacemaker", "") if soup.title else rel_path
+    date_elem = soup.find(class_="report-date")
+    date = date_elem.get_text() if date_elem else ""
+
+    # Extract all text content
+    # We specifically want text from 'main' or 'container'.
+    # One text node per line; compact_text() cleans it up once all reports are parsed
+    main_content = soup.find("main")
+    if main_content:
+        text = main_content.get_text(separator="\n", strip=True)
+    else:
+        text = soup.get_text(separator="\n", strip=True)
+
+    # Extract tags if any
+    tags = [tag.get_text() for tag in soup.find_all(class_="tag")]
+
+    return {
+        "id": rel_path,
+        "title": title,
+        "date": date,
+        "tags": tags,
+        "content": text,
+        "url": f"./{rel_path}/"
+    }
+
+
+def file_hash(path):
+    """Return the sha256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_json(path, default):
+    """Load a JSON file, falling back to default if it is missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def split_blocks(text):
+    """Whitespace-collapsed text blocks (one per text node) of a freshly parsed report."""
+    return [" ".join(line.split()) for line in text.split("\n") if line.strip()]
+
+
+def block_hash(block):
+    return hashlib.sha1(block.encode("utf-8")).hexdigest()[:12]
+
+
+def block_hashes(blocks):
+    """Hashes of a report's blocks long enough to count as boilerplate, for the manifest."""
+    return sorted({block_hash(b) for b in blocks if len(b) >= BOILERPLATE_MIN_CHARS})
+
+
+def find_boilerplate(manifest):
+    """Hashes of the blocks repeated across enough of the manifest's reports."""
+    counts = Counter(h for entry in manifest.values() for h in entry.get("blocks", []))
+    needed = max(BOILERPLATE_MIN_REPORTS, math.ceil(BOILERPLATE_SHARE * len(manifest)))
+    return {h for h, n in counts.items() if n >= needed}
+
+
+def compact_text(blocks, boilerplate):
+    """Report text without scaffolding and boilerplate blocks, single-spaced."""
+    return " ".join(
+        b for b in blocks
+        if not SCAFFOLD_RE.match(b)
+        and (len(b) < BOILERPLATE_MIN_CHARS or block_hash(b) not in boilerplate)
+    )
+
+
+def tokenize(text):
+    """
+    Split text into index terms.
+
+    Korean has no reliable word boundaries (particles attach to nouns), so each
+    run of Hangul syllables becomes overlapping bigrams ("비영리" -> "비영",
+    "영리"); a single syllable is kept as-is. Latin words and numbers are
+    lowercased whole words.
+    """
+    tokens = []
+    for run in TOKEN_RE.findall(text.lower()):
+        if HANGUL_RE.match(run) and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def build_inverted_index(reports):
+    """
+    Build the compact document table and term postings for the landing page.
+
+    Postings are flat [doc, tf, doc, tf, ...] lists where tf already includes
+    the title/tag weights, and each doc carries its weighted length.
+    """
+    docs = []
+    terms = {}
+    for doc_id, report in enumerate(reports):
+        counts = {}
+        fields = (
+            (report["title"], TITLE_WEIGHT),
+            (" ".join(report["tags"]), TAG_WEIGHT),
+            (report["content"], 1),
+        )
+        for text, weight in fields:
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + weight
+
+        for token, tf in counts.items():
+            terms.setdefault(token, []).extend((doc_id, tf))
+
+        docs.append({
+            "id": report["id"],
+            "title": report["title"],
+            "date": report["date"],
+            "tags": report["tags"],
+            "url": report["url"],
+            "len": sum(counts.values()),
+        })
+
+    return {"version": 1, "docs": docs, "terms": dict(sorted(terms.items()))}
+
+
+def parse_report_date(report):
+    """
+    Best-effort date for a report: its .report-date text, or the MMDDYYYY
+    folder name used for weekly reports. Returns None if neither parses.
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(report["date"].strip(), fmt).date()
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(os.path.basename(report["id"]), "%m%d%Y").date()
+    except ValueError:
+        return None
+
+
+def shard_key(report, shard_by):
+    """Name of the content shard a report goes into."""
+    if shard_by == "month":
+        date = parse_report_date(report)
+        return date.strftime("%Y-%m") if date else "undated"
+    return re.sub(r"[^A-Za-z0-9_-]", "_", report["id"])
+
+
+def write_json(path, data, minify=False, compress=False):
+    """
+    Write data as JSON. Minified output drops all whitespace; compressed output
+    also writes .gz (and .br when brotli is installed) next to the file.
+    """
+    if minify:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    raw = text.encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(raw)
+    if compress:
+        # mtime=0 keeps the .gz byte-identical between runs
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(raw, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + ".br", "wb") as f:
+                f.write(brotli.compress(raw))
+    else:
+        # Don't leave stale pre-compressed copies from an earlier sharded run
+        for ext in (".gz", ".br"):
+            if os.path.exists(path + ext):
+                os.remove(path + ext)
+    return len(raw)
+
+
+def write_shards(base_dir, reports, shard_by):
+    """
+    Write the content shards, minified and pre-compressed. Stale shards
+    (and anything else left in search/) are removed.
+    Returns {report id: shard file name relative to search/}.
+    """
+    shard_dir = os.path.join(base_dir, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    shards = {}
+    shard_of = {}
+    for report in reports:
+        name = shard_key(report, shard_by) + ".json"
+        shards.setdefault(name, {})[report["id"]] = report["content"]
+        shard_of[report["id"]] = name
+
+    for name, contents in shards.items():
+        write_json(os.path.join(shard_dir, name), contents, minify=True, compress=True)
+    remove_shards(base_dir, keep=set(shards))
+
+    return shard_of
+
+
+def render_cards(reports, overrides):
+    """Report card markup for the landing page, newest report first."""
+    dated = sorted(reports, key=lambda r: (parse_report_date(r) or datetime.min.date(), r["id"]), reverse=True)
+    cards = []
+    for number, report in enumerate(dated, 1):
+        card = {**report, **overrides.get(report["id"], {})}
+        description = card.get("description")
+        style = card.get("header_style")
+        cards.append(CARD_TEMPLATE.substitute(
+            number=number,
+            id=html.escape(card["id"]),
+            url=html.escape(card["url"]),
+            date=html.escape(card["date"]),
+            title=html.escape(card["title"]),
+            header_style=f' style="{html.escape(style)}"' if style else "",
+            description=f'\n            <p class="card-description">{html.escape(description)}</p>' if description else "",
+            tags="".join(f'\n              <span class="tag">{html.escape(tag)}</span>' for tag in card["tags"]),
+        ))
+    return "".join(cards) + "\n        "
+
+
+def update_landing_page(base_dir, reports):
+    """
+    Re-render the card list between the markers in the root index.html.
+    Everything outside the markers is left alone, and the file is only
+    written when the rendered cards differ from what is there.
+    Returns True if the page was rewritten.
+    """
+    page_file = os.path.join(base_dir, LANDING_PAGE)
+    try:
+        with open(page_file, "r", encoding="utf-8") as f:
+            page = f.read()
+    except FileNotFoundError:
+        return False
+    start = page.find(CARDS_START)
+    end = page.find(CARDS_END, start)
+    if start == -1 or end == -1:
+        print(f"Note: no {CARDS_START} markers in {page_file}, report cards not updated")
+        return False
+
+    start += len(CARDS_START)
+    cards = render_cards(reports, load_json(os.path.join(base_dir, CARDS_FILE), {}))
+    if page[start:end] == cards:
+        return False
+    with open(page_file, "w", encoding="utf-8") as f:
+        f.write(page[:start] + cards + page[end:])
+    return True
+
+
+def remove_shards(base_dir, keep=()):
+    """Delete the files in search/ except the shards named in `keep` (and their .gz/.br)."""
+    shard_dir = os.path.join(base_dir, SHARD_DIR)
+    if not os.path.isdir(shard_dir):
+        return
+    for filename in os.listdir(shard_dir):
+        if filename.split(".json")[0] + ".json" not in keep:
+            os.remove(os.path.join(shard_dir, filename))
+    if not keep and not os.listdir(shard_dir):
+        os.rmdir(shard_dir)
+
+
+def _parse_report_job(job):
+    """
+    Process pool entry point: job is (html_path, rel_path, parser). Returns
+    (record, seconds); the parent adds the timing to its profile, since
+    spans recorded in a worker process never reach it.
+    """
+    start = time.perf_counter()
+    record = parse_report(*job)
+    return record, time.perf_counter() - start
+
+
+def parse_reports(jobs, workers=1):
+    """Parse (html_path, rel_path, parser) jobs, in order, on up to `workers` processes."""
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_parse_report_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_parse_report_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    records = []
+    for job, (record, seconds) in zip(jobs, results):
+        profiling.record("index.parse_report", seconds, path=job[1])
+        records.append(record)
+    return records
+
+
+def index_reports(base_dir=BASE_DIR, incremental=False, jobs=1, parser="html.parser", shard_by=None):
+    """
+    Build search-index.json from every report folder under base_dir.
+
+    In incremental mode only reports whose mtime/size changed are re-read, and
+    only those whose content hash changed are re-parsed; the rest are reused
+    from the existing index. Reports whose folders were deleted are dropped.
+    Parsing is spread over `jobs` worker processes.
+
+    Parsed text is compacted before indexing: whitespace runs collapse to one
+    space, "Section NN" labels are dropped, and so are text blocks repeated in
+    most reports (see find_boilerplate). The manifest keeps hashes of each
+    report's candidate blocks so incremental runs can judge repetition without
+    re-reading untouched reports.
+
+    With shard_by ("report" or "month") report text is also split into
+    minified, pre-compressed shards under search/ that the landing page
+    fetches only when it needs snippets; the inverted index's document table
+    records which shard holds each report.
+
+    Finally the report cards on the landing page are re-rendered from the
+    records (see update_landing_page).
+    """
+    index_file = os.path.join(base_dir, INDEX_FILE)
+    manifest_file = os.path.join(base_dir, MANIFEST_FILE)
+
+    old_manifest = load_json(manifest_file, {}) if incremental else {}
+    old_records = {}
+    if incremental:
+        old_records = {r["id"]: r for r in load_json(index_file, []) if "id" in r}
+
+    reports = []
+    manifest = {}
+    to_parse = []  # (position in reports, job)
+    reused = 0
+
+    with profiling.span("index.scan"):
+        for rel_path, html_path in find_reports(base_dir):
+            st = os.stat(html_path)
+            entry = old_manifest.get(rel_path)
+            record = old_records.get(rel_path)
+
+            if not (entry and "blocks" in entry):
+                record = None  # indexed before text compaction
+            if record and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                # Untouched since the last run
+                manifest[rel_path] = entry
+                reports.append(record)
+                reused += 1
+                continue
+
+            digest = file_hash(html_path)
+            manifest[rel_path] = {"mtime": st.st_mtime_ns, "size": st.st_size, "hash": digest}
+            if record and entry["hash"] == digest:
+                # Touched (e.g. checkout) but content is identical
+                manifest[rel_path]["blocks"] = entry["blocks"]
+                reused += 1
+            else:
+                record = None
+                to_parse.append((len(reports), (html_path, rel_path, parser)))
+            reports.append(record)
+
+    parsed = len(to_parse)
+    with profiling.span("index.parse", reports=parsed, jobs=jobs):
+        results = parse_reports([job for _, job in to_parse], jobs)
+    blocks = {}  # position -> text blocks of the reports parsed this run
+    for (pos, _), record in zip(to_parse, results):
+        reports[pos] = record
+        blocks[pos] = split_blocks(record["content"])
+        manifest[record["id"]]["blocks"] = block_hashes(blocks[pos])
+
+    # Boilerplate is judged across all reports. Reused reports were compacted
+    # against the previous run's set; re-parse those it no longer fits.
+    boilerplate = find_boilerplate(manifest)
+    changed = boilerplate ^ find_boilerplate(old_manifest)
+    stale = [pos for pos, report in enumerate(reports)
+             if changed and pos not in blocks and changed & set(manifest[report["id"]]["blocks"])]
+    if stale:
+        with profiling.span("index.parse", reports=len(stale), jobs=jobs):
+            results = parse_reports([(os.path.join(base_dir, reports[pos]["id"], "index.html"),
+                                      reports[pos]["id"], parser) for pos in stale], jobs)
+        for pos, record in zip(stale, results):
+            reports[pos] = record
+            blocks[pos] = split_blocks(record["content"])
+        parsed += len(stale)
+        reused -= len(stale)
+
+    raw_size = size = 0
+    with profiling.span("index.compact", reports=len(blocks)):
+        for pos, report_blocks in blocks.items():
+            raw_size += len(reports[pos]["content"])
+            reports[pos]["content"] = compact_text(report_blocks, boilerplate)
+            size += len(reports[pos]["content"])
+
+    removed = len(set(old_manifest) - set(manifest))
+
+    sharded = shard_by is not None
+    with profiling.span("index.write"):
+        write_json(index_file, reports, minify=sharded, compress=sharded)
+
+    with profiling.span("index.inverted"):
+        inverted_index = build_inverted_index(reports)
+    with profiling.span("index.write"):
+        if sharded:
+            shard_of = write_shards(base_dir, reports, shard_by)
+            for doc in inverted_index["docs"]:
+                doc["shard"] = shard_of[doc["id"]]
+            print(f"Wrote {len(set(shard_of.values()))} content shard(s) to {os.path.join(base_dir, SHARD_DIR)}")
+        else:
+            # Shards from an earlier sharded run would go stale
+            remove_shards(base_dir)
+
+        inverted_file = os.path.join(base_dir, INVERTED_INDEX_FILE)
+        write_json(inverted_file, inverted_index, minify=True, compress=sharded)
+
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+        if update_landing_page(base_dir, reports):
+            print(f"Updated the report cards in {os.path.join(base_dir, LANDING_PAGE)}")
+
+    if blocks:
+        saved = 1 - size / raw_size if raw_size else 0
+        print(f"Compacted text of {len(blocks)} report(s): {raw_size:,} -> {size:,} characters "
+              f"(-{saved:.1%}, {len(boilerplate)} boilerplate block(s))")
+    if incremental:
+        print(f"Parsed {parsed} changed report(s), reused {reused}, removed {removed}")
+    print(f"Successfully indexed {len(reports)} reports to {index_file} and {inverted_file}")
+
 
 if __name__ == "__main__":
-    index_reports()
+    parser = argparse.ArgumentParser(description="Build search-index.json from the report folders.")
+    parser.add_argument("--base-dir", default=BASE_DIR, help="Folder containing the report folders")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-parse reports that changed since the last run")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes used to parse reports")
+    parser.add_argument("--parser", choices=PARSERS, default="html.parser",
+                        help="HTML parser backend (lxml must be installed separately)")
+    parser.add_argument("--shard-by", choices=SHARD_MODES,
+                        help="Also write minified, pre-compressed content shards under search/")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    index_reports(args.base_dir, incremental=args.incremental, jobs=args.jobs,
+                  parser=args.parser, shard_by=args.shard_by)
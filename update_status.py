@@ -1,41 +1,55 @@
 import os
 import re
-import requests
+import hmac
 import json
 import glob
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_KEY = os.getenv("LINEAR_API_KEY")
-URL = "https://api.linear.app/graphql"
+import time
+import hashlib
+import argparse
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from linear_client import API_KEY, graphql_query, format_stats
+from note_sync import chunks, run_parallel, load_json, save_json, DEFAULT_JOBS
+from linear_metadata import FINISHED_STATE_TYPES
+import profiling
 
 if not API_KEY:
     print("Error: LINEAR_API_KEY not found in .env")
     exit(1)
 
-headers = {
-    "Authorization": API_KEY,
-    "Content-Type": "application/json"
-}
+# Aliases per query. Each lookup costs a few complexity points, so this keeps a
+# query far below Linear's per-request complexity cap however large a note is.
+STATE_BATCH_SIZE = 100
+# Pattern: [PAC-XXXX](https://linear.app/...
+LINK_RE = re.compile(r'\[([A-Z]+-\d+)\]\(https://linear\.app/')
+# State types that get struck through
+DONE_STATES = list(FINISHED_STATE_TYPES)
+TARGET_DIR = "meeting_notes"
+# Persistent identifier -> row index, so refreshes only reread files that changed
+ROW_INDEX_FILE = os.path.join(".linear_sync", "rows.json")
 
-def graphql_query(query, variables=None):
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
-    response = requests.post(URL, headers=headers, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"GraphQL request failed: {response.status_code} {response.text}")
-    return response.json()
+# Webhook receiver (--serve). The secret is shown when creating the webhook in Linear.
+WEBHOOK_SECRET = os.getenv("LINEAR_WEBHOOK_SECRET")
+# Reject deliveries older than this many seconds (replay protection)
+WEBHOOK_TOLERANCE = int(os.getenv("LINEAR_WEBHOOK_TOLERANCE", "60"))
 
-def get_issue_states(identifiers):
+def get_issue_states(identifiers, jobs=DEFAULT_JOBS):
     """
     Fetches the state type for a list of issue identifiers (e.g., ['PAC-1', 'PAC-2']).
     Returns a dict: {'PAC-1': 'completed', 'PAC-2': 'started', ...}
+    Identifiers are deduplicated and split into STATE_BATCH_SIZE chunks that
+    are fetched up to `jobs` at a time.
+    """
+    states = {}
+    unique = sorted(set(identifiers))
+    for batch_states in run_parallel(_fetch_state_batch, chunks(unique, STATE_BATCH_SIZE), jobs):
+        states.update(batch_states)
+    return states
+
+def _fetch_state_batch(identifiers):
+    """
+    Fetch states for one chunk of identifiers.
     Using GraphQL aliases to batch fetch by identifier since 'issue(id: ...)' supports identifiers.
     """
-    if not identifiers:
-        return {}
 
     # Construct aliased query
     # {
@@ -52,7 +66,8 @@ def get_issue_states(identifiers):
     
     query = "\n".join(query_lines)
     
-    result = graphql_query(query)
+    # Unknown identifiers come back as per-alias errors; keep the rest
+    result = graphql_query(query, raise_on_errors=False)
     
     states = {}
     if result.get("data"):
@@ -62,18 +77,16 @@ def get_issue_states(identifiers):
             
     return states
 
-def update_file(file_path):
-    print(f"Checking {file_path}...")
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
+def find_linked_rows(lines):
+    """
+    Returns [(line_index, identifier)] for table rows that link a Linear issue.
+    """
     # Regex to find Linear Issue IDs in the link column or anywhere
     # Identifying pattern: [PAC-12](https://linear.app/...)
     # We specifically look for the table row structure to know which column to strike through.
     
     # Table structure expected: | Project | Priority | Item | ...
     
-    ids_to_fetch = []
     line_map = [] # Store (line_index, identifier)
     
     for i, line in enumerate(lines):
@@ -81,105 +94,292 @@ def update_file(file_path):
             continue
             
         # Check if line has linear link
-        # Pattern: [PAC-XXXX](...
-        match = re.search(r'\[([A-Z]+-\d+)\]\(https://linear\.app/', line)
+        match = LINK_RE.search(line)
         if match:
-            identifier = match.group(1)
-            ids_to_fetch.append(identifier)
-            line_map.append((i, identifier))
+            line_map.append((i, match.group(1)))
+    return line_map
 
-    if not ids_to_fetch:
-        # print("  No Linear links found.")
-        return
+def read_lines(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.readlines()
 
-    # Fetch statuses
-    print(f"  Fetching status for {len(ids_to_fetch)} issues...")
-    states = get_issue_states(ids_to_fetch)
+def strike_item(line):
+    """
+    Strike through the "Item" column (index 3) of a table row.
+    Returns (new_line, item_text); new_line is None if the row is not a valid
+    table row or is already struck through.
+    """
+    parts = [p.strip() for p in line.split('|')]
+    
+    # Simple validation of table structure
+    # | Project | Priority | Item | Description | ...
+    # parts[0] is empty string (before first |), parts[1] is Project, parts[2] is Priority, parts[3] is Item
+    if len(parts) < 4:
+        return None, None
+    item_text = parts[3]
+    
+    # Check if already struck through
+    if item_text.startswith("~~") and item_text.endswith("~~"):
+        return None, item_text
     
-    updates_made = 0
+    # Apply strikethrough
+    new_item_text = f"~~{item_text}~~"
     
-    for line_idx, identifier in line_map:
-        state_type = states.get(identifier)
-        if not state_type:
+    # Reconstruct line. Need to preserve original spacing? 
+    # .split('|') destroys spacing. Better to just replace the text substring if possible, 
+    # but valid markdown table doesn't require pretty alignment. 
+    # "Meeting" might appear in several cells, so only touch the Item cell:
+    # re-split WITHOUT stripping to preserve whitespace.
+    raw_parts = line.split('|')
+    
+    # we know raw_parts[3].strip() == item_text
+    # we want to replace item_text with ~~item_text~~ within raw_parts[3]
+    raw_parts[3] = raw_parts[3].replace(item_text, new_item_text, 1)
+    return "|".join(raw_parts), item_text
+
+def is_struck(line):
+    """Whether the "Item" column of a table row is already struck through."""
+    parts = [p.strip() for p in line.split('|')]
+    return len(parts) >= 4 and parts[3].startswith("~~") and parts[3].endswith("~~")
+
+def load_row_index():
+    """
+    Load the on-disk row index:
+    {"files": {path: mtime}, "rows": {identifier: [[path, line_index, struck], ...]}}
+    """
+    index = load_json(ROW_INDEX_FILE, {})
+    if "files" not in index or "rows" not in index:
+        index = {"files": {}, "rows": {}}
+    return index
+
+def save_row_index(index):
+    save_json(ROW_INDEX_FILE, index)
+
+def build_row_index(files):
+    """Index the linked rows of the given files from scratch."""
+    index = {"files": {}, "rows": {}}
+    for file_path in files:
+        index_file(index, file_path)
+    return index
+
+def index_file(index, file_path, lines=None):
+    """(Re)index one file, replacing any rows previously recorded for it."""
+    for identifier in list(index["rows"]):
+        rows = [row for row in index["rows"][identifier] if row[0] != file_path]
+        if rows:
+            index["rows"][identifier] = rows
+        else:
+            del index["rows"][identifier]
+    index["files"].pop(file_path, None)
+
+    if not os.path.exists(file_path):
+        return
+    if lines is None:
+        lines = read_lines(file_path)
+    index["files"][file_path] = os.path.getmtime(file_path)
+    for line_idx, identifier in find_linked_rows(lines):
+        index["rows"].setdefault(identifier, []).append([file_path, line_idx, is_struck(lines[line_idx])])
+
+def refresh_row_index(index, target_dir=TARGET_DIR):
+    """
+    Reindex files that were added, removed or modified since they were indexed.
+    Returns the number of files reread.
+    """
+    files = set(glob.glob(os.path.join(target_dir, "*.md")))
+    reread = 0
+    for file_path in files | set(index["files"]):
+        try:
+            mtime = os.path.getmtime(file_path)
+        except OSError:
+            mtime = None
+        if mtime is None or index["files"].get(file_path) != mtime:
+            index_file(index, file_path)
+            reread += 1
+    return reread
+
+def pending_identifiers(index):
+    """Identifiers with at least one row that is not struck through yet."""
+    return [identifier for identifier, rows in index["rows"].items() if not all(row[2] for row in rows)]
+
+def apply_states(index, states):
+    """
+    Strike through indexed rows whose issue is completed/canceled. Only files
+    holding such rows are opened, each once, and rows already struck through
+    are skipped without reading. Returns the number of rows changed.
+    """
+    by_file = {}
+    for identifier, state_type in states.items():
+        if state_type not in DONE_STATES:
             continue
-            
-        # If Completed or Canceled, apply strikethrough to "Item" column (index 3)
-        if state_type in ["completed", "canceled"]:
-            line = lines[line_idx]
-            parts = [p.strip() for p in line.split('|')]
-            
-            # Simple validation of table structure
-            # | Project | Priority | Item | Description | ...
-            # parts[0] is empty string (before first |), parts[1] is Project, parts[2] is Priority, parts[3] is Item
-            if len(parts) >= 4:
-                item_text = parts[3]
-                
-                # Check if already struck through
-                if item_text.startswith("~~") and item_text.endswith("~~"):
-                    continue
-                
-                # Apply strikethrough
-                new_item_text = f"~~{item_text}~~"
-                
-                # Reconstruct line. Need to preserve original spacing? 
-                # .split('|') destroys spacing. Better to just replace the text substring if possible, 
-                # but valid markdown table doesn't require pretty alignment. 
-                # To be safe and keep it clean, let's reconstruct simply.
-                
-                # Actually, simply replacing the string in the raw line might be safer to preserve other formatting
-                # formatted_line = line.replace(f" {item_text} ", f" {new_item_text} ") 
-                # but item_text from split calls .strip(), so we need to be careful.
-                
-                # Robust approach: Reconstruct the pipe-separated string.
-                parts[3] = f" {new_item_text} " # Add padding spaces for readablity
-                
-                # Careful with empty first/last parts from split
-                # if line started with |, parts[0] is ''
-                # if line ended with |\n, parts[-1] is ''
-                
-                # Let's try to reconstruct strictly based on parts
-                # We need to handle the padding of other cells to avoid ugly diffs?
-                # For now, functional correctness > pretty alignment.
-                
-                # Retain original padding for other cells? Too hard.
-                # Just join with " | "
-                
-                # Wait, let's try to just replace the specific "Item" text if it's unique enough?
-                # No, "Meeting" might appear multiple times.
-                
-                # Let's go with reconstruction.
-                # We stripped parts earlier for logic.
-                # Let's re-split WITHOUT stripping to preserve whitespace?
-                raw_parts = line.split('|')
-                # raw_parts[3] is the one we want to change.
-                
-                # we know raw_parts[3].strip() == item_text
-                # we want to replace item_text with ~~item_text~~ within raw_parts[3]
-                
-                original_cell_content = raw_parts[3]
-                new_cell_content = original_cell_content.replace(item_text, new_item_text, 1)
-                
-                raw_parts[3] = new_cell_content
-                new_line = "|".join(raw_parts)
-                
-                lines[line_idx] = new_line
-                updates_made += 1
-                print(f"  -> Marked {identifier} as {state_type}: {item_text}")
-
-    if updates_made > 0:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
-        print(f"  Saved {updates_made} updates to {file_path}")
-    else:
-        print("  No updates needed.")
+        for row in index["rows"].get(identifier, []):
+            if not row[2]:
+                by_file.setdefault(row[0], []).append((row, identifier, state_type))
 
-if __name__ == "__main__":
-    # Scan all markdown files in meeting_notes/
-    target_dir = "meeting_notes" 
-    files = glob.glob(os.path.join(target_dir, "*.md"))
+    changed = 0
+    for file_path, rows in by_file.items():
+        try:
+            lines = read_lines(file_path)
+        except OSError:
+            index_file(index, file_path)  # deleted since it was indexed: drop its rows
+            continue
+        updates_made = 0
+        stale = False
+        for row, identifier, state_type in rows:
+            line_idx = row[1]
+            match = LINK_RE.search(lines[line_idx]) if line_idx < len(lines) else None
+            if not match or match.group(1) != identifier:
+                stale = True  # file edited since indexing; reindexed below
+                continue
+            new_line, item_text = strike_item(lines[line_idx])
+            row[2] = True
+            if new_line is None:
+                continue
+            lines[line_idx] = new_line
+            updates_made += 1
+            print(f"  -> Marked {identifier} as {state_type}: {item_text} ({file_path})")
+
+        if updates_made:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            print(f"  Saved {updates_made} updates to {file_path}")
+            changed += updates_made
+        try:
+            mtime = None if stale else os.path.getmtime(file_path)
+        except OSError:
+            mtime = None
+        if mtime is None:
+            # Forget the mtime so refresh_row_index() rereads the file next time
+            index["files"].pop(file_path, None)
+        else:
+            index["files"][file_path] = mtime
+    return changed
+
+def apply_state_change(index, identifier, state_type):
+    """Apply one issue's new state (webhook path). Returns the number of rows changed."""
+    return apply_states(index, {identifier: state_type})
+
+def refresh_statuses(target_dir=TARGET_DIR, jobs=DEFAULT_JOBS):
+    """
+    Strike through rows of finished issues. Only files changed since the last
+    run are reread, and only issues with rows left to strike are looked up.
+    Returns the number of rows changed.
+    """
+    with profiling.span("status.scan"):
+        index = load_row_index()
+        reread = refresh_row_index(index, target_dir)
     
     print(f"Target Directory: {target_dir}")
-    print(f"Found {len(files)} markdown files.")
-    
-    for file_path in files:
-        update_file(file_path)
+    print(f"Found {len(index['files'])} markdown files ({reread} changed since last run).")
+
+    # Only issues with rows still to strike through need a lookup, each once
+    identifiers = pending_identifiers(index)
+    print(f"Fetching status for {len(identifiers)} unique issues...")
+    states = get_issue_states(identifiers, jobs=jobs)
+
+    with profiling.span("status.apply"):
+        changed = apply_states(index, states)
+        save_row_index(index)
+    if not changed:
+        print("No updates needed.")
+    return changed
+
+def verify_signature(body, signature, secret):
+    """Linear signs the raw body with HMAC-SHA256 in the Linear-Signature header."""
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+def handle_webhook(payload, index, target_dir=TARGET_DIR):
+    """Apply one Issue webhook payload to the notes in target_dir. Returns a short status message."""
+    if payload.get("type") != "Issue":
+        return "ignored: not an Issue event"
+    data = payload.get("data") or {}
+    identifier = data.get("identifier")
+    if not identifier:
+        return "ignored: no identifier"
+
+    state_type = (data.get("state") or {}).get("type")
+    if state_type is None:
+        # Older payloads may omit the state; ask Linear for this one issue
+        state_type = get_issue_states([identifier]).get(identifier)
+
+    refresh_row_index(index, target_dir)
+    changed = apply_state_change(index, identifier, state_type)
+    save_row_index(index)
+    return f"{identifier} is {state_type}: {changed} row(s) updated"
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Receives Linear webhooks; the server carries .index, .secret and .target_dir."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not verify_signature(body, self.headers.get("Linear-Signature"), self.server.secret):
+            return self.reply(401, "invalid signature")
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self.reply(400, "invalid JSON")
+
+        sent_at = payload.get("webhookTimestamp", 0) / 1000
+        if abs(time.time() - sent_at) > WEBHOOK_TOLERANCE:
+            return self.reply(400, "stale delivery")
+
+        message = handle_webhook(payload, self.server.index, self.server.target_dir)
+        print(f"Webhook {payload.get('action')}: {message}")
+        self.reply(200, message)
+
+    def reply(self, status, message):
+        body = message.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(host, port, secret, target_dir=TARGET_DIR):
+    """
+    Run the webhook receiver. Requests are handled one at a time, so file
+    writes never race.
+    """
+    index = load_row_index()
+    refresh_row_index(index, target_dir)
+    save_row_index(index)
+    server = HTTPServer((host, port), WebhookHandler)
+    server.index = index
+    server.secret = secret
+    server.target_dir = target_dir
+    print(f"Indexed {sum(len(r) for r in index['rows'].values())} linked rows in {len(index['files'])} files")
+    print(f"Listening for Linear webhooks on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strike through finished Linear issues in meeting notes.")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS,
+                        help="Maximum number of concurrent state lookups")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run a webhook receiver instead of polling every issue")
+    parser.add_argument("--target-dir", default=TARGET_DIR, help="Folder of meeting notes to update")
+    parser.add_argument("--host", default="127.0.0.1", help="Webhook receiver address")
+    parser.add_argument("--port", type=int, default=8787, help="Webhook receiver port")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a timing summary at exit (same as LINEAR_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    if args.serve:
+        if not WEBHOOK_SECRET:
+            print("Error: LINEAR_WEBHOOK_SECRET not found in .env")
+            exit(1)
+        serve(args.host, args.port, WEBHOOK_SECRET, args.target_dir)
+        exit(0)
+
+    refresh_statuses(args.target_dir, jobs=args.jobs)
+    print(format_stats())